@@ -1 +1,5 @@
 from ._simulation import Simulator
+from ._artifact_store import ArtifactStore
+from ._vhdl_library import VhdlLibrary
+from ._build_report import BuildReport
+from ._condition import Condition, Equals, BitSet, AllOf, AnyOf, Not
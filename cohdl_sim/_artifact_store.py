@@ -0,0 +1,184 @@
+import os
+import time
+import shutil
+
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+    import msvcrt
+
+
+DEFAULT_STORE_DIR = Path.home() / ".cache" / "cohdl_sim"
+
+# marks entries, that were built successfully
+_COMPLETE_MARKER = ".complete"
+
+
+def _lock_file(file, blocking=True, shared=False) -> bool:
+    if fcntl is not None:
+        flags = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+
+        if not blocking:
+            flags |= fcntl.LOCK_NB
+
+        try:
+            fcntl.flock(file.fileno(), flags)
+        except BlockingIOError:
+            return False
+
+        return True
+
+    # msvcrt only supports exclusive locks,
+    # shared locks are exclusive on Windows
+    while True:
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not blocking:
+                return False
+            time.sleep(0.1)
+
+
+def _unlock_file(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _dir_size(path: Path) -> int:
+    return sum(
+        (Path(root) / name).stat().st_size
+        for root, _, files in os.walk(path)
+        for name in files
+    )
+
+
+class ArtifactStore:
+    def __init__(
+        self, root: str | os.PathLike | None = None, *, max_size: int = 4 * 1024**3
+    ):
+        if root is None:
+            root = os.getenv("COHDL_SIM_CACHE", DEFAULT_STORE_DIR)
+
+        self.root = Path(root).expanduser()
+        self.max_size = max_size
+
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def entry(self, key: str) -> Path:
+        return self.root / key
+
+    def is_complete(self, entry: Path) -> bool:
+        return (entry / _COMPLETE_MARKER).exists()
+
+    def mark_complete(self, entry: Path):
+        (entry / _COMPLETE_MARKER).touch()
+
+    def _lock(self, key: str, shared: bool):
+        path = self.root / f"{key}.lock"
+
+        while True:
+            lock = open(path, "a+")
+            _lock_file(lock, shared=shared)
+
+            # evict deletes the lock files of removed entries,
+            # retry when the file was deleted while waiting for the lock
+            try:
+                if os.path.samestat(os.fstat(lock.fileno()), os.stat(path)):
+                    return lock
+            except FileNotFoundError:
+                pass
+
+            _unlock_file(lock)
+            lock.close()
+
+    @contextmanager
+    def acquire(self, key: str, build):
+        # Yield the directory of the entry for `key`. Missing entries are
+        # built by calling `build(entry)` under an exclusive lock, so only
+        # one process builds them while the rest wait for the result.
+        # The complete entry is used with a shared lock, that is held until
+        # the context exits, evict skips entries while they are in use.
+        entry = self.entry(key)
+
+        while True:
+            lock = self._lock(key, shared=True)
+
+            if self.is_complete(entry):
+                break
+
+            _unlock_file(lock)
+            lock.close()
+
+            lock = self._lock(key, shared=False)
+
+            try:
+                if not self.is_complete(entry):
+                    # remove leftovers of interrupted builds
+                    shutil.rmtree(entry, ignore_errors=True)
+                    entry.mkdir()
+
+                    build(entry)
+
+                    self.mark_complete(entry)
+                    self.evict(keep=key)
+            finally:
+                _unlock_file(lock)
+                lock.close()
+
+            # the lock is reopened in shared mode,
+            # the entry is built again if it was evicted meanwhile
+
+        try:
+            # modification time of the marker is used for LRU eviction
+            os.utime(entry / _COMPLETE_MARKER)
+            yield entry
+        finally:
+            _unlock_file(lock)
+            lock.close()
+
+    def evict(self, keep: str | None = None):
+        # delete least recently used entries until
+        # the store is smaller than max_size
+        entries = []
+
+        for entry in self.root.iterdir():
+            if entry.is_dir() and entry.name != keep:
+                marker = entry / _COMPLETE_MARKER
+                last_used = marker.stat().st_mtime if marker.exists() else 0
+                entries.append((last_used, entry, _dir_size(entry)))
+
+        total = sum(size for _, _, size in entries)
+
+        if keep is not None and self.entry(keep).exists():
+            total += _dir_size(self.entry(keep))
+
+        for _, entry, size in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_size:
+                break
+
+            lock_path = self.root / f"{entry.name}.lock"
+
+            with open(lock_path, "a+") as lock:
+                # entries in use (by this or other processes) are skipped
+                if not _lock_file(lock, blocking=False):
+                    continue
+
+                try:
+                    shutil.rmtree(entry, ignore_errors=True)
+                    total -= size
+
+                    try:
+                        lock_path.unlink()
+                    except OSError:
+                        # open files cannot be deleted on Windows
+                        pass
+                finally:
+                    _unlock_file(lock)
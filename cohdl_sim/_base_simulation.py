@@ -9,6 +9,10 @@ from cohdl import std
 from cohdl import Null
 
 from ._proxy_port import ProxyPort
+from ._artifact_store import ArtifactStore
+from ._build_report import BuildReport
+from ._vhdl_library import VhdlLibrary
+from ._cycle import _CyclePorts, CycleHandle
 
 
 class Task:
@@ -29,7 +33,12 @@ class _GenericParams:
         extra_env: dict[str, str] | None = None,
         extra_vhdl_files: list[str] = None,
         extra_vhdl_files_post: list[str] = None,
-        use_build_cache: bool = False,
+        use_build_cache: bool = True,
+        artifact_store: ArtifactStore | str | None = None,
+        vhdl_libraries: list[VhdlLibrary] | None = None,
+        write_build_report: bool = False,
+        build_profile: str = "default",
+        ghdl_backend: str | None = None,
     ):
         self.entity = entity
         self.build_dir = Path(build_dir)
@@ -44,13 +53,26 @@ class _GenericParams:
         self.extra_vhdl_files_post = (
             [] if extra_vhdl_files_post is None else extra_vhdl_files_post
         )
+        self.vhdl_libraries = [] if vhdl_libraries is None else vhdl_libraries
 
         self.cache_file = self.build_dir / ".build-cache.json"
 
-        # use cache file requested and available, rebuild it otherwise
-        self.use_build_cache = use_build_cache and self.cache_file.exists()
+        # the cache file stores a hash of all build inputs,
+        # build outputs are only reused when it matches the current design
+        self.use_build_cache = use_build_cache
+
+        # timing of the build phases is written next to the cache file
+        self.write_build_report = write_build_report
+        self.report_file = self.build_dir / ".build-report.json"
+
+        if artifact_store is None or isinstance(artifact_store, ArtifactStore):
+            self.artifact_store = artifact_store
+        else:
+            self.artifact_store = ArtifactStore(artifact_store)
 
         self.cast_vectors = cast_vectors
+        self.build_profile = build_profile
+        self.ghdl_backend = ghdl_backend
 
         for dir in (self.build_dir, self.sim_dir, self.vhdl_dir):
             if not os.path.exists(dir):
@@ -60,6 +82,7 @@ class _GenericParams:
 class _BaseSimulator(ABC):
     def __init__(self, params: _GenericParams):
         self._params = params
+        self.build_report = BuildReport()
 
     @abstractmethod
     def test(self, testbench, /): ...
@@ -67,6 +90,12 @@ class _BaseSimulator(ABC):
     @abstractmethod
     async def wait(self, duration: std.Duration, /): ...
 
+    @abstractmethod
+    async def wait_until(self, time: std.Duration | int, /): ...
+
+    @abstractmethod
+    def now(self) -> int: ...
+
     @abstractmethod
     async def delta_step(self): ...
 
@@ -99,11 +128,62 @@ class _BaseSimulator(ABC):
     @abstractmethod
     def start_soon(self, coro, /) -> Task: ...
 
+    @abstractmethod
+    async def first(self, *awaitables) -> int | None: ...
+
+    @abstractmethod
+    async def all(self, *awaitables) -> list: ...
+
+    @abstractmethod
+    async def with_timeout(self, awaitable, duration: std.Duration, /): ...
+
     @abstractmethod
     def gen_clock(
-        self, clk, period_or_frequency: std.Duration = None, /, start_state=False
+        self,
+        clk,
+        period_or_frequency: std.Duration = None,
+        /,
+        start_state=False,
+        phase: std.Duration | None = None,
     ): ...
 
+    @staticmethod
+    def _cycle_clock(clk, rising: bool):
+        # clock signal and active edge of on_cycle
+        if isinstance(clk, std.Clock):
+            assert (
+                clk.edge() is not std.Clock.Edge.BOTH
+            ), "on_cycle requires a clock with a single active edge"
+            return clk.signal(), clk.is_rising_edge()
+
+        return clk, rising
+
+    def on_cycle(self, clk, fn, /, inputs=(), outputs=(), rising=True):
+        clk, rising = self._cycle_clock(clk, rising)
+        ports = _CyclePorts(inputs, outputs)
+        handle = CycleHandle()
+
+        # ports are sampled after the edge like in true_after_rising
+        async def cycle_thread():
+            while True:
+                if rising:
+                    await self.rising_edge(clk)
+                else:
+                    await self.falling_edge(clk)
+
+                await self.delta_step()
+
+                if handle.removed:
+                    return
+
+                ports.drive(fn(*ports.sample()))
+
+        self.start_soon(cycle_thread())
+        return handle
+
+    def remove_on_cycle(self, handle: CycleHandle, /):
+        handle.remove()
+
     def init_inputs(self, init_val=Null, /):
         for port in self._input_ports.values():
             port <<= init_val
@@ -141,7 +221,22 @@ class _BaseSimulator(ABC):
             else:
                 await self.falling_edge(reset.signal())
 
-    async def true_on_rising(self, clk: ProxyPort, cond, *, timeout: int | None = None):
+    async def _condition_timeout(self, awaitable, duration: std.Duration):
+        # Time limits are checked by a single timer. Exceeding them raises
+        # the same exception as exceeding the number of clock edges.
+        try:
+            return await self.with_timeout(awaitable, duration)
+        except TimeoutError:
+            raise AssertionError("timeout while waiting for condition") from None
+
+    async def true_on_rising(
+        self, clk: ProxyPort, cond, *, timeout: int | std.Duration | None = None
+    ):
+        if isinstance(timeout, std.Duration):
+            return await self._condition_timeout(
+                self.true_on_rising(clk, cond), timeout
+            )
+
         while True:
             await self.rising_edge(clk)
 
@@ -153,8 +248,13 @@ class _BaseSimulator(ABC):
                 timeout -= 1
 
     async def true_on_falling(
-        self, clk: ProxyPort, cond, *, timeout: int | None = None
+        self, clk: ProxyPort, cond, *, timeout: int | std.Duration | None = None
     ):
+        if isinstance(timeout, std.Duration):
+            return await self._condition_timeout(
+                self.true_on_falling(clk, cond), timeout
+            )
+
         while True:
             await self.falling_edge(clk)
 
@@ -165,15 +265,22 @@ class _BaseSimulator(ABC):
                 assert timeout != 0, "timeout while waiting for condition"
                 timeout -= 1
 
-    async def true_on_clk(self, clk: std.Clock, cond, *, timeout: int | None = None):
+    async def true_on_clk(
+        self, clk: std.Clock, cond, *, timeout: int | std.Duration | None = None
+    ):
         if clk.is_rising_edge():
             await self.true_on_rising(clk.signal(), cond, timeout=timeout)
         else:
             await self.true_on_falling(clk.signal(), cond, timeout=timeout)
 
     async def true_after_rising(
-        self, clk: ProxyPort, cond, *, timeout: int | None = None
+        self, clk: ProxyPort, cond, *, timeout: int | std.Duration | None = None
     ):
+        if isinstance(timeout, std.Duration):
+            return await self._condition_timeout(
+                self.true_after_rising(clk, cond), timeout
+            )
+
         while True:
             await self.rising_edge(clk)
             await self.delta_step()
@@ -186,8 +293,13 @@ class _BaseSimulator(ABC):
                 timeout -= 1
 
     async def true_after_falling(
-        self, clk: ProxyPort, cond, *, timeout: int | None = None
+        self, clk: ProxyPort, cond, *, timeout: int | std.Duration | None = None
     ):
+        if isinstance(timeout, std.Duration):
+            return await self._condition_timeout(
+                self.true_after_falling(clk, cond), timeout
+            )
+
         while True:
             await self.falling_edge(clk)
             await self.delta_step()
@@ -199,7 +311,9 @@ class _BaseSimulator(ABC):
                 assert timeout != 0, "timeout while waiting for condition"
                 timeout -= 1
 
-    async def true_after_clk(self, clk: std.Clock, cond, *, timeout: int | None = None):
+    async def true_after_clk(
+        self, clk: std.Clock, cond, *, timeout: int | std.Duration | None = None
+    ):
         if clk.is_rising_edge():
             await self.true_after_rising(clk.signal(), cond, timeout=timeout)
         else:
@@ -3,6 +3,7 @@ from cohdl import std
 from cohdl import Null
 
 from ._proxy_port import ProxyPort
+from ._build_report import BuildReport
 
 class Task:
     async def join(self):
@@ -10,7 +11,18 @@ class Task:
         Wait until the task is done
         """
 
+class CycleHandle:
+    """
+    returned by `on_cycle`, pass it to `remove_on_cycle`
+    to stop calling the cycle function
+    """
+
 class _BaseSimulator:
+    build_report: BuildReport
+    """
+    wall and CPU time (including child processes) of each build phase
+    """
+
     def test(self, testbench, /):
         """
         decorator that turns coroutines into test benches
@@ -22,6 +34,18 @@ class _BaseSimulator:
         wait for a given simulation duration
         """
 
+    async def wait_until(self, time: std.Duration | int, /) -> None:
+        """
+        wait until the simulation time reaches `time`
+        (a duration or an integer in picoseconds),
+        returns immediately if `time` is not in the future
+        """
+
+    def now(self) -> int:
+        """
+        return the current simulation time in picoseconds
+        """
+
     async def delta_step(self) -> None:
         """
         run simulation for a short time to update output ports
@@ -77,12 +101,35 @@ class _BaseSimulator:
         `coro` will start once the current task is suspended.
         """
 
+    async def first(self, *awaitables) -> int | None:
+        """
+        Wait until the first of the given awaitables is done
+        and return its index. The remaining awaitables are cancelled.
+        Returns None, when no awaitables are given.
+
+        example: `await sim.first(sim.rising_edge(irq), sim.wait(std.us(1)))`
+        """
+
+    async def all(self, *awaitables) -> list:
+        """
+        Wait until all given awaitables are done
+        and return a list of their results.
+        """
+
+    async def with_timeout(self, awaitable, duration: std.Duration, /):
+        """
+        Wait for `awaitable` and return its result.
+        Raises TimeoutError and cancels `awaitable`,
+        when it does not finish within the given simulation time.
+        """
+
     def gen_clock(
         self,
         clk: Signal[Bit] | std.Clock,
         period_or_frequency: std.Duration | std.Frequency | None = None,
         /,
         start_state=False,
+        phase: std.Duration | None = None,
     ) -> None:
         """
         Start a parallel task that produces a clock signal
@@ -90,6 +137,68 @@ class _BaseSimulator:
 
         The `period_of_frequency` parameter is mandatory unless
         `clk` is a `std.Clock` and defines its own frequency.
+
+        `clk` is set to `start_state` immediately. When `phase`
+        is given, the first toggle of the clock is delayed by this duration.
+        Several clocks with different periods and phases can be
+        generated at the same time.
+
+        In `ghdl_sim`, clocks on top level ports are toggled by the
+        simulator interface without resuming Python code on each edge,
+        calling `gen_clock` again for the same top level port replaces
+        the previous clock of that port.
+
+        The cocotb based simulators use `cocotb.clock.Clock` for top level
+        ports. It writes the port directly instead of going through
+        the port proxy, but still resumes a Python coroutine on each edge
+        (cocotb 1.9 has no clock driven by the simulator).
+        """
+
+    def on_cycle(
+        self,
+        clk: Signal[Bit] | std.Clock,
+        fn,
+        /,
+        inputs: list[Signal] = (),
+        outputs: list[Signal] = (),
+        rising=True,
+    ) -> CycleHandle:
+        """
+        Call the plain function `fn` once per clock cycle, shortly after
+        each rising (or falling when `rising` is False) edge of `clk`.
+
+        `fn` is called with the current values of the `outputs` ports
+        as positional arguments and returns the new values of the `inputs`
+        ports (a sequence with one value per input, a single value when
+        there is only one input or None to leave all inputs unchanged).
+        Single bits are passed as bools, vectors as ints (signed ints for
+        Signed ports). Only top level ports can be used.
+
+        ghdl_sim samples and drives all ports in the simulator interface,
+        no coroutine is resumed per cycle.
+
+        example:
+
+        ```
+        samples = iter(range(100))
+        results = []
+
+        def step(valid, dout):
+            if valid:
+                results.append(dout)
+            return next(samples, 0)
+
+        handle = sim.on_cycle(entity.clk, step, inputs=[entity.din], outputs=[entity.valid, entity.dout])
+        ...
+        sim.remove_on_cycle(handle)
+        ```
+        """
+
+    def remove_on_cycle(self, handle: CycleHandle, /) -> None:
+        """
+        Stop calling the cycle function registered by `on_cycle`.
+        The function is not called again, starting with the next cycle.
+        Removing a handle more than once has no effect.
         """
 
     def init_inputs(self, init_val=Null, /):
@@ -118,32 +227,37 @@ class _BaseSimulator:
         """
 
     async def true_on_rising(
-        self, clk: Signal[Bit], cond, *, timeout: int | None = None
+        self, clk: Signal[Bit], cond, *, timeout: int | std.Duration | None = None
     ) -> None:
         """
         Wait until cond is true after a rising edge of the clock signal.
         `cond` can be a port or a callable taking no arguments returning a boolean value.
-        Raises an exception if the condition remains false for more than timeout rising edges.
+        Raises an AssertionError if the condition remains false for more than timeout rising edges.
+        When timeout is a `std.Duration` the same exception is raised after this simulation time.
         """
 
     async def true_on_falling(
-        self, clk: Signal[Bit], cond, *, timeout: int | None = None
+        self, clk: Signal[Bit], cond, *, timeout: int | std.Duration | None = None
     ) -> None:
         """
         Wait until cond is true after a falling edge of the clock signal.
         `cond` can be a port or a callable taking no arguments returning a boolean value.
-        Raises an exception if the condition remains false for more than timeout falling edges.
+        Raises an AssertionError if the condition remains false for more than timeout falling edges.
+        When timeout is a `std.Duration` the same exception is raised after this simulation time.
         """
 
-    async def true_on_clk(self, clk: std.Clock, cond, *, timeout: int | None = None):
+    async def true_on_clk(
+        self, clk: std.Clock, cond, *, timeout: int | std.Duration | None = None
+    ):
         """
         Wait until cond is true after a clock tick.
         `cond` can be a port or a callable taking no arguments returning a boolean value.
-        Raises an exception if the condition remains false for more than timeout ticks.
+        Raises an AssertionError if the condition remains false for more than timeout ticks.
+        When timeout is a `std.Duration` the same exception is raised after this simulation time.
         """
 
     async def true_after_rising(
-        self, clk: ProxyPort, cond, *, timeout: int | None = None
+        self, clk: ProxyPort, cond, *, timeout: int | std.Duration | None = None
     ):
         while True:
             await self.rising_edge(clk)
@@ -157,7 +271,7 @@ class _BaseSimulator:
                 timeout -= 1
 
     async def true_after_falling(
-        self, clk: ProxyPort, cond, *, timeout: int | None = None
+        self, clk: ProxyPort, cond, *, timeout: int | std.Duration | None = None
     ):
         while True:
             await self.falling_edge(clk)
@@ -170,7 +284,9 @@ class _BaseSimulator:
                 assert timeout != 0, "timeout while waiting for condition"
                 timeout -= 1
 
-    async def true_after_clk(self, clk: std.Clock, cond, *, timeout: int | None = None):
+    async def true_after_clk(
+        self, clk: std.Clock, cond, *, timeout: int | std.Duration | None = None
+    ):
         if clk.is_rising_edge():
             await self.true_after_rising(clk.signal(), cond, timeout=timeout)
         else:
@@ -3,7 +3,12 @@ from cohdl import std, Bit, BitVector, Unsigned, Signed, Port, Entity
 
 from dataclasses import dataclass
 from pathlib import Path
+import hashlib
 import json
+import tempfile
+
+from ._vhdl_library import VhdlLibrary, with_dependencies
+from ._toolchain import toolchain_version
 
 
 def _store_port_info(port: cohdl.Port):
@@ -20,7 +25,7 @@ def _store_port_info(port: cohdl.Port):
 
         if issubclass(port_type, Unsigned):
             return {"type": "Unsigned", "width": w, "dir": dir}
-        if issubclass(port_type, Unsigned):
+        if issubclass(port_type, Signed):
             return {"type": "Signed", "width": w, "dir": dir}
 
         return {"type": "BitVector", "width": w, "dir": dir}
@@ -48,22 +53,141 @@ def _load_port_info(info: dict):
     return Port[t, dir]()
 
 
+def _top_ports(entity: type[Entity]):
+    return {
+        name: _store_port_info(port) for name, port in entity._cohdl_info.ports.items()
+    }
+
+
+def _library_sources(lib) -> dict[str, str]:
+    # Map file names to the VHDL code of all entities in `lib`.
+    # The public write_dir always rewrites every file, which would reset
+    # the modification times used by the incremental analysis.
+    # Use the private entity list of cohdl's library when it exists
+    # and fall back to write_dir into a temporary directory otherwise.
+    # This is the only place, that depends on cohdl internals.
+    entities = getattr(lib, "_entities", None)
+
+    if entities is not None:
+        return {f"{entity.name()}.vhd": entity.write() for entity in entities}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        return {
+            Path(file_path).name: Path(file_path).read_text().removesuffix("\n")
+            for file_path in lib.write_dir(tmp_dir)
+        }
+
+
+def generate_sources(entity: type[Entity], vhdl_dir: Path) -> dict[str, str]:
+    # translate the entity into VHDL and return a mapping
+    # from target file path to file content
+    lib = std.VhdlCompiler.to_vhdl_library(entity)
+
+    return {
+        str(Path(vhdl_dir) / name): content
+        for name, content in _library_sources(lib).items()
+    }
+
+
+def write_sources(sources: dict[str, str]):
+    # files with unchanged content are not rewritten so
+    # their modification times are preserved
+    for file_path, content in sources.items():
+        content = content + "\n"
+
+        try:
+            with open(file_path) as file:
+                if file.read() == content:
+                    continue
+        except OSError:
+            pass
+
+        with open(file_path, "w") as file:
+            file.write(content)
+
+
+def design_hash(
+    entity: type[Entity],
+    sources: dict[str, str],
+    extra_vhdl_files: list[str],
+    extra_vhdl_files_post: list[str],
+    toolchain: str,
+    libraries: list[VhdlLibrary] = (),
+    build_profile: str = "default",
+) -> str:
+    h = hashlib.sha256()
+
+    def update(*parts: str | bytes):
+        for part in parts:
+            h.update(part if isinstance(part, bytes) else part.encode())
+            h.update(b"\0")
+
+    update("toolchain", toolchain)
+    update("build_profile", build_profile)
+    update("top_ports", json.dumps(_top_ports(entity), sort_keys=True))
+
+    for lib in with_dependencies(libraries):
+        update("library", lib.name, lib.content_hash(toolchain))
+
+    for file_path in extra_vhdl_files:
+        update("extra", str(file_path), Path(file_path).read_bytes())
+
+    for file_path, content in sources.items():
+        update("generated", Path(file_path).name, content)
+
+    for file_path in extra_vhdl_files_post:
+        update("extra_post", str(file_path), Path(file_path).read_bytes())
+
+    return h.hexdigest()
+
+
 @dataclass
 class CacheContent:
     vhdl_sources: list[str]
+    design_hash: str | None = None
 
 
-def write_cache_file(path: Path, entity: type[Entity], vhdl_sources: list[str]):
-    top_ports = {
-        name: _store_port_info(port) for name, port in entity._cohdl_info.ports.items()
-    }
-
+def write_cache_file(
+    path: Path,
+    entity: type[Entity],
+    vhdl_sources: list[str],
+    design_hash: str,
+    artifacts: list[Path] = (),
+):
     with open(path, "w") as cache:
         json.dump(
-            {"vhdl_sources": vhdl_sources, "top_ports": top_ports}, cache, indent=2
+            {
+                "design_hash": design_hash,
+                "vhdl_sources": vhdl_sources,
+                "artifacts": [str(file) for file in artifacts],
+                "top_ports": _top_ports(entity),
+            },
+            cache,
+            indent=2,
         )
 
 
+def is_up_to_date(path: Path, design_hash: str, artifacts: list[Path] = ()) -> bool:
+    # True when the cache file was written for the same design hash
+    # and the same artifacts and all files produced by the previous
+    # build still exist. Artifacts with the same hash may be built
+    # in different ways (for example locally or in an artifact store),
+    # an existing file is not necessarily the one described by the cache.
+    try:
+        with open(path) as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        return False
+
+    if cache.get("design_hash") != design_hash:
+        return False
+
+    if cache.get("artifacts", []) != [str(file) for file in artifacts]:
+        return False
+
+    return all(Path(file).exists() for file in [*cache["vhdl_sources"], *artifacts])
+
+
 def load_cache_file(path: Path, entity: type[Entity]) -> CacheContent:
     with open(path) as cache_file:
         cache = json.load(cache_file)
@@ -75,4 +199,4 @@ def load_cache_file(path: Path, entity: type[Entity]) -> CacheContent:
         if not hasattr(entity, name):
             std.add_entity_port(entity, _load_port_info(info), name=name)
 
-    return CacheContent(vhdl_sources=vhdl_sources)
+    return CacheContent(vhdl_sources=vhdl_sources, design_hash=cache.get("design_hash"))
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import contextvars
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+def _children_cpu_time():
+    # CPU time of all terminated child processes of this process
+    if resource is None:
+        return 0.0
+
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return children.ru_utime + children.ru_stime
+
+
+# CPU time accumulators of the phases, that are active in the current context.
+# Designs are built concurrently in different threads, so the CPU time of
+# each subprocess is reported explicitly via `record_subprocess`.
+_active_phases = contextvars.ContextVar("_active_phases", default=())
+
+
+def record_subprocess(cpu_time: float):
+    # add the CPU time of a terminated subprocess to all active phases,
+    # worker threads must run in a copy of the context of the phase
+    for accumulator in _active_phases.get():
+        accumulator[0] += cpu_time
+
+
+@dataclass
+class Phase:
+    name: str
+    wall_time: float
+    cpu_time: float
+    file_count: int = 0
+    file_size: int = 0
+
+
+@dataclass
+class BuildReport:
+    phases: list[Phase] = field(default_factory=list)
+
+    @contextmanager
+    def phase(self, name: str, files=(), all_children=False):
+        # Measure the duration of the enclosed block, `files` are counted
+        # after the block completes so it may contain produced outputs.
+        # The CPU time includes the current thread and the subprocesses
+        # passed to `record_subprocess`. When `all_children` is set, all child
+        # processes terminated meanwhile are included instead, for subprocesses
+        # started by other libraries (this figure is process wide).
+        accumulator = [0.0]
+        token = _active_phases.set((*_active_phases.get(), accumulator))
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        children_start = _children_cpu_time()
+
+        try:
+            yield
+        finally:
+            _active_phases.reset(token)
+
+        if all_children:
+            children = _children_cpu_time() - children_start
+        else:
+            children = accumulator[0]
+
+        self.add(
+            name,
+            time.perf_counter() - wall_start,
+            time.thread_time() - cpu_start + children,
+            files=files,
+        )
+
+    def add(self, name: str, wall_time: float, cpu_time: float, files=()):
+        files = [Path(file) for file in files]
+
+        self.phases.append(
+            Phase(
+                name=name,
+                wall_time=wall_time,
+                cpu_time=cpu_time,
+                file_count=len(files),
+                file_size=sum(file.stat().st_size for file in files if file.exists()),
+            )
+        )
+
+    def wall_time(self) -> float:
+        return sum(phase.wall_time for phase in self.phases)
+
+    def cpu_time(self) -> float:
+        return sum(phase.cpu_time for phase in self.phases)
+
+    def to_dict(self):
+        return {
+            "wall_time": self.wall_time(),
+            "cpu_time": self.cpu_time(),
+            "phases": [asdict(phase) for phase in self.phases],
+        }
+
+    def write_json(self, path: str | os.PathLike):
+        with open(path, "w") as report_file:
+            json.dump(self.to_dict(), report_file, indent=2)
+
+    def __str__(self):
+        lines = [f"{'phase':<20} {'wall [s]':>10} {'cpu [s]':>10} {'files':>6}"]
+
+        for phase in [*self.phases, Phase("total", self.wall_time(), self.cpu_time())]:
+            lines.append(
+                f"{phase.name:<20} {phase.wall_time:>10.3f} {phase.cpu_time:>10.3f} {phase.file_count:>6}"
+            )
+
+        return "\n".join(lines)
@@ -0,0 +1,139 @@
+from cohdl import Bit, BitVector, Signed, Unsigned
+
+from ._base_proxy_port import _BaseProxyPort
+
+
+def _port_binstr(port: _BaseProxyPort) -> str:
+    # current value of a port as binary string (msb first)
+    port._load()
+    value = port._Wrapped
+
+    if isinstance(value, (Signed, Unsigned)):
+        value = value.bitvector
+
+    return str(value)
+
+
+def _value_binstr(port: _BaseProxyPort, value) -> str:
+    # `value` converted to the type of `port` as binary string (msb first)
+    port_type = port._type
+
+    if issubclass(port_type, Bit):
+        return "1" if value else "0"
+
+    assert issubclass(port_type, BitVector), f"unsupported port type {port_type}"
+
+    if isinstance(value, _BaseProxyPort):
+        raise AssertionError("conditions compare ports with constant values")
+
+    if isinstance(value, int):
+        value = (Signed if issubclass(port_type, Signed) else Unsigned)[
+            port_type.width
+        ](value)
+    elif isinstance(value, str):
+        value = BitVector[port_type.width](value)
+
+    if isinstance(value, (Signed, Unsigned)):
+        value = value.bitvector
+
+    assert (
+        value.width == port_type.width
+    ), f"width of value {value} does not match port type {port_type}"
+
+    return str(value)
+
+
+class Condition:
+    # Conditions are callable, so they can be used everywhere
+    # a `cond` function is expected (for example in true_on_rising).
+    # Simulators, that support native conditions, evaluate them
+    # without resuming Python code.
+
+    def __call__(self) -> bool:
+        raise AssertionError("abstract method called")
+
+    def __and__(self, other):
+        return AllOf(self, other)
+
+    def __or__(self, other):
+        return AnyOf(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+
+class Equals(Condition):
+    def __init__(self, port: _BaseProxyPort, value):
+        assert isinstance(port, _BaseProxyPort) and port._is_root(), (
+            "conditions can only be defined for top level ports, "
+            "use BitSet to check single bits of vector ports"
+        )
+
+        self.port = port
+        # the condition holds, when the binary string of the port
+        # contains `value` starting at `offset`
+        self.offset = 0
+        self.value = _value_binstr(port, value)
+
+    def __call__(self):
+        binstr = _port_binstr(self.port)
+        return binstr[self.offset : self.offset + len(self.value)] == self.value
+
+
+class BitSet(Equals):
+    def __init__(self, port: _BaseProxyPort, index: int | None = None):
+        if index is None:
+            super().__init__(port, True)
+
+            assert issubclass(
+                port._type, Bit
+            ), "BitSet requires a bit index for vector ports"
+        else:
+            super().__init__(port, 0)
+
+            width = port._type.width
+            assert 0 <= index < width, f"bit index {index} out of range"
+
+            self.offset = width - 1 - index
+            self.value = "1"
+
+
+class AllOf(Condition):
+    def __init__(self, *conditions):
+        self.conditions = [as_condition(cond, required=True) for cond in conditions]
+
+    def __call__(self):
+        return all(cond() for cond in self.conditions)
+
+
+class AnyOf(Condition):
+    def __init__(self, *conditions):
+        self.conditions = [as_condition(cond, required=True) for cond in conditions]
+
+    def __call__(self):
+        return any(cond() for cond in self.conditions)
+
+
+class Not(Condition):
+    def __init__(self, condition):
+        self.condition = as_condition(condition, required=True)
+
+    def __call__(self):
+        return not self.condition()
+
+
+def as_condition(cond, required=False) -> Condition | None:
+    # single bit top level ports are treated like BitSet(port),
+    # returns None for other callables (unless `required` is set)
+    if isinstance(cond, Condition):
+        return cond
+
+    if (
+        isinstance(cond, _BaseProxyPort)
+        and cond._is_root()
+        and issubclass(cond._type, Bit)
+    ):
+        return BitSet(cond)
+
+    assert not required, f"{cond} cannot be used as a condition"
+    return None
@@ -0,0 +1,56 @@
+from cohdl import Signal, Bit, BitVector
+
+class Condition:
+    """
+    Declarative condition on top level ports, that can be passed
+    as `cond` to `true_on_rising`, `true_on_falling`, `true_on_clk`,
+    `true_after_rising`, `true_after_falling` and `true_after_clk`.
+
+    Conditions are callable and work with all simulators.
+    ghdl_sim evaluates them in the simulator interface, so the
+    testbench is only resumed once the condition holds.
+
+    Conditions can be combined using `&`, `|` and `~`.
+    """
+
+    def __call__(self) -> bool:
+        """
+        evaluate the condition for the current values of the ports
+        """
+
+    def __and__(self, other) -> AllOf: ...
+    def __or__(self, other) -> AnyOf: ...
+    def __invert__(self) -> Not: ...
+
+class Equals(Condition):
+    def __init__(self, port: Signal, value: int | str | Bit | BitVector):
+        """
+        true when `port` equals the constant `value`
+        """
+
+class BitSet(Equals):
+    def __init__(self, port: Signal, index: int | None = None):
+        """
+        true when the single bit `port` or the bit `index`
+        of the vector `port` is set, `index` is required for vector ports
+        """
+
+class AllOf(Condition):
+    def __init__(self, *conditions: Condition | Signal[Bit]):
+        """
+        true when all conditions are true,
+        single bit ports are checked with BitSet
+        """
+
+class AnyOf(Condition):
+    def __init__(self, *conditions: Condition | Signal[Bit]):
+        """
+        true when at least one condition is true,
+        single bit ports are checked with BitSet
+        """
+
+class Not(Condition):
+    def __init__(self, condition: Condition | Signal[Bit]):
+        """
+        true when `condition` is false
+        """
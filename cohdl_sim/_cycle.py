@@ -0,0 +1,126 @@
+from cohdl import Bit, BitVector, Signed
+
+from ._base_proxy_port import _BaseProxyPort
+from ._condition import _port_binstr, _value_binstr
+
+
+def _check_port(port):
+    assert isinstance(port, _BaseProxyPort) and port._is_root(), (
+        "cycle functions can only sample and drive top level ports, "
+        f"{port} is not a top level port"
+    )
+
+    assert issubclass(
+        port._type, (Bit, BitVector)
+    ), f"unsupported port type {port._type}"
+
+    return port
+
+
+def _reader(port: _BaseProxyPort):
+    # binary string (msb first) -> plain Python value
+    port_type = port._type
+
+    if issubclass(port_type, Bit):
+        return lambda binstr: binstr == "1"
+
+    if issubclass(port_type, Signed):
+        sign = 1 << port_type.width
+
+        def read_signed(binstr):
+            value = int(binstr, 2)
+            return value - sign if binstr[0] == "1" else value
+
+        return read_signed
+
+    return lambda binstr: int(binstr, 2)
+
+
+def _writer(port: _BaseProxyPort):
+    # plain Python value -> binary string (msb first)
+    port_type = port._type
+
+    if issubclass(port_type, Bit):
+        return lambda value: "1" if value else "0"
+
+    width = port_type.width
+    fmt = f"0{width}b"
+
+    if issubclass(port_type, Signed):
+        low, high = -(1 << (width - 1)), 1 << (width - 1)
+    else:
+        low, high = 0, 1 << width
+
+    mask = (1 << width) - 1
+
+    def write(value):
+        if not isinstance(value, int):
+            return _value_binstr(port, value)
+
+        assert low <= value < high, f"value {value} out of range for port {port}"
+        return format(value & mask, fmt)
+
+    return write
+
+
+class _CyclePorts:
+    # Converts between the binary strings of ports and the values
+    # passed to and returned by cycle functions. Single bits are
+    # bools, vectors are ints (Signed ports use signed ints).
+
+    def __init__(self, inputs, outputs):
+        self.inputs = [_check_port(port) for port in inputs]
+        self.outputs = [_check_port(port) for port in outputs]
+
+        self._readers = [_reader(port) for port in self.outputs]
+        self._writers = [_writer(port) for port in self.inputs]
+
+    def values(self, binstrs: list[str]) -> list:
+        return [read(binstr) for read, binstr in zip(self._readers, binstrs)]
+
+    def binstrs(self, result) -> list[str] | None:
+        # `result` is None, a single value (when there is one input)
+        # or a sequence with one value per input,
+        # None values leave the corresponding input unchanged
+        if result is None:
+            return None
+
+        if len(self.inputs) == 1 and not isinstance(result, (tuple, list)):
+            result = (result,)
+
+        assert len(result) == len(
+            self.inputs
+        ), f"the cycle function returned {len(result)} values for {len(self.inputs)} inputs"
+
+        return [
+            "" if value is None else write(value)
+            for write, value in zip(self._writers, result)
+        ]
+
+    def sample(self) -> list:
+        return self.values([_port_binstr(port) for port in self.outputs])
+
+    def drive(self, result):
+        binstrs = self.binstrs(result)
+
+        if binstrs is not None:
+            for port, binstr in zip(self.inputs, binstrs):
+                if binstr:
+                    port._Wrapped._assign(binstr)
+                    port._store()
+
+
+class CycleHandle:
+    # Returned by on_cycle. Once removed, the cycle function is not
+    # called again. `on_remove` unregisters native cycle callbacks.
+
+    def __init__(self, on_remove=None):
+        self.removed = False
+        self._on_remove = on_remove
+
+    def remove(self):
+        if not self.removed:
+            self.removed = True
+
+            if self._on_remove is not None:
+                self._on_remove()
@@ -1,9 +1,18 @@
 from cohdl import Bit, BitVector, Signal
 
-from cocotb.handle import Freeze, Release
-from cocotb.triggers import RisingEdge, FallingEdge, Edge, ClockCycles
 from ._base_proxy_port import _BaseProxyPort
 
+# cocotb is imported when the first port is created,
+# so importing cohdl_sim does not load cocotb
+Freeze = Release = RisingEdge = FallingEdge = Edge = ClockCycles = None
+
+
+def _import_cocotb():
+    global Freeze, Release, RisingEdge, FallingEdge, Edge, ClockCycles
+
+    from cocotb.handle import Freeze, Release
+    from cocotb.triggers import RisingEdge, FallingEdge, Edge, ClockCycles
+
 
 class ProxyPort(_BaseProxyPort):
     def __init__(
@@ -14,6 +23,9 @@ class ProxyPort(_BaseProxyPort):
     ):
         super().__init__(entity_port, root)
 
+        if Edge is None:
+            _import_cocotb()
+
         # only set in root port
         self._cocotb_port = cocotb_port
 
@@ -99,10 +111,10 @@ class ProxyPort(_BaseProxyPort):
             await ClockCycles(self._cocotb_port, num_cycles, rising)
         else:
             if rising:
-                for _ in num_cycles:
+                for _ in range(num_cycles):
                     await self._rising_edge()
             else:
-                for _ in num_cycles:
+                for _ in range(num_cycles):
                     await self._falling_edge()
 
     def __await__(self):
@@ -1,19 +1,34 @@
 import os
-import cocotb
+import sys
+import shutil
 import functools
 
-from cocotb.triggers import (
-    Timer,
-    Edge,
-)
+from pathlib import Path
 
-from cocotb_test import simulator as cocotb_simulator
-
-from cohdl import Entity, Port, BitVector, Signed, Unsigned
+from cohdl import Entity, Port, Bit, BitVector, Signed, Unsigned
 from cohdl import std
 
 from ._proxy_port import ProxyPort
 from ._base_simulation import _GenericParams, _BaseSimulator
+from ._artifact_store import ArtifactStore
+from ._vhdl_library import VhdlLibrary, with_dependencies
+
+# cocotb and cocotb-test are imported when the first Simulator is created,
+# so importing cohdl_sim (for example during test collection) stays cheap
+cocotb = Timer = Edge = First = Combine = Clock = cocotb_simulator = None
+cocotb_with_timeout = get_sim_time = None
+
+
+def _import_cocotb():
+    global cocotb, Timer, Edge, First, Combine, Clock, cocotb_simulator
+    global cocotb_with_timeout, get_sim_time
+
+    import cocotb
+    from cocotb.triggers import Timer, Edge, First, Combine
+    from cocotb.triggers import with_timeout as cocotb_with_timeout
+    from cocotb.utils import get_sim_time
+    from cocotb.clock import Clock
+    from cocotb_test import simulator as cocotb_simulator
 
 
 class Task:
@@ -27,7 +42,18 @@ class Task:
 class Simulator(_BaseSimulator):
 
     def _init_impl(self, p: _GenericParams, cocotb_extra_args=None):
-        from cohdl_sim._build_cache import write_cache_file, load_cache_file
+        from cohdl_sim._build_cache import (
+            generate_sources,
+            write_sources,
+            design_hash,
+            toolchain_version,
+            write_cache_file,
+            is_up_to_date,
+            load_cache_file,
+        )
+
+        if cocotb is None:
+            _import_cocotb()
 
         # This code is evaluated twice. Once in normal user code
         # to setup the test environment and again from another process
@@ -39,49 +65,143 @@ class Simulator(_BaseSimulator):
             # start cocotb simulator
 
             top_name = p.entity._cohdl_info.name
+            report = self.build_report
 
-            if not p.use_build_cache:
-                lib = std.VhdlCompiler.to_vhdl_library(p.entity)
-                vhdl_sources = (
-                    p.extra_vhdl_files
-                    + lib.write_dir(p.vhdl_dir)
-                    + p.extra_vhdl_files_post
-                )
+            with report.phase("elaboration"):
+                sources = generate_sources(p.entity, p.vhdl_dir)
 
-                write_cache_file(p.cache_file, p.entity, vhdl_sources=vhdl_sources)
-            else:
-                cache_content = load_cache_file(p.cache_file, p.entity)
-                vhdl_sources = cache_content.vhdl_sources
+            vhdl_sources = p.extra_vhdl_files + list(sources) + p.extra_vhdl_files_post
+
+            current_hash = design_hash(
+                p.entity,
+                sources,
+                p.extra_vhdl_files,
+                p.extra_vhdl_files_post,
+                toolchain_version(p.simulator),
+                libraries=p.vhdl_libraries,
+            )
+
+            # Unchanged sources are not rewritten. The simulator
+            # sees the old modification times and skips recompilation.
+            if not (p.use_build_cache and is_up_to_date(p.cache_file, current_hash)):
+                with report.phase("write", files=sources):
+                    write_sources(sources)
+                    write_cache_file(p.cache_file, p.entity, vhdl_sources, current_hash)
 
             # cocotb_simulator.run() requires the module name
-            # of the Python file containing the test benches
+            # of the Python file containing the test benches,
+            # that is the first caller outside of cohdl_sim
+
+            frame = sys._getframe()
 
-            import inspect
-            import pathlib
+            while frame.f_globals.get("__name__", "").startswith("cohdl_sim."):
+                frame = frame.f_back
 
-            filename = inspect.stack()[2].filename
-            filename = pathlib.Path(filename).stem
+            filename = Path(frame.f_code.co_filename).stem
 
             cocotb_extra_args = {} if cocotb_extra_args is None else cocotb_extra_args
 
-            cocotb_simulator.run(
+            # cocotb-test analyzes each library into a separate directory,
+            # the design itself is placed in a library named after the top entity
+            library_sources = {
+                **{lib.name: lib.files for lib in with_dependencies(p.vhdl_libraries)},
+                top_name.lower(): vhdl_sources,
+            }
+
+            run_args = dict(
                 simulator=p.simulator,
                 sim_args=p.sim_args,
-                sim_build=p.sim_dir,
-                vhdl_sources=vhdl_sources,
                 toplevel=top_name.lower(),
                 module=filename,
-                extra_env={"COHDLSIM_TEST_RUNNING": "True", **p.extra_env},
+                extra_env={
+                    "COHDLSIM_TEST_RUNNING": "True",
+                    "COHDLSIM_CACHE_FILE": str(p.cache_file.absolute()),
+                    **p.extra_env,
+                },
                 **cocotb_extra_args,
             )
+
+            if p.artifact_store is not None:
+                with report.phase("store", all_children=True):
+                    library_sources = self._build_in_store(
+                        p.artifact_store,
+                        f"cocotb-{p.simulator}-{current_hash}",
+                        library_sources,
+                        p.sim_dir,
+                        run_args,
+                    )
+
+            # cocotb-test compiles outdated sources and runs the tests
+            # in a single step, both are reported as one phase
+            with report.phase("simulation", all_children=True):
+                self._run_simulation(p.sim_dir, library_sources, run_args)
+
+            if p.write_build_report:
+                report.write_json(p.report_file)
         else:
             # running in simulator process
             # initialize members used by Simulator.test
 
-            # instantiate entity to generate dynamic ports
-            p.entity(_cohdl_instantiate_only=True)
+            # The cache file, written by the parent process, contains
+            # all top level ports (including dynamic ports). Restore them
+            # from there instead of elaborating the entity again.
+            cache_file = os.getenv("COHDLSIM_CACHE_FILE")
+
+            if cache_file is not None:
+                load_cache_file(Path(cache_file), p.entity)
+            else:
+                p.entity(_cohdl_instantiate_only=True)
+
             self._dut = None
 
+    def _run_simulation(
+        self, sim_build: Path, library_sources: dict[str, list[str]], run_args
+    ):
+        cocotb_simulator.run(
+            sim_build=sim_build,
+            vhdl_sources=library_sources,
+            **run_args,
+        )
+
+    @staticmethod
+    def _build_in_store(
+        store: ArtifactStore,
+        key: str,
+        library_sources: dict[str, list[str]],
+        sim_dir: Path,
+        run_args,
+    ):
+        # Compile the design once into a `sim_build` directory in the store
+        # and copy the result to the local simulation directory.
+        # The copy keeps modification times, so cocotb-test treats it as
+        # up to date and does not recompile the design. The sources are
+        # copied as well, the simulation does not use files in the store,
+        # that could be evicted by other processes.
+        def sources_in(root: Path):
+            return {
+                lib: [str(root / "vhdl" / lib / Path(src).name) for src in sources]
+                for lib, sources in library_sources.items()
+            }
+
+        def build(entry: Path):
+            for lib, sources in library_sources.items():
+                (entry / "vhdl" / lib).mkdir(parents=True)
+
+                for source, target in zip(sources, sources_in(entry)[lib]):
+                    shutil.copyfile(source, target)
+
+            cocotb_simulator.run(
+                sim_build=entry / "sim_build",
+                vhdl_sources=sources_in(entry),
+                **{**run_args, "compile_only": True},
+            )
+
+        with store.acquire(key, build) as entry:
+            shutil.copytree(entry / "sim_build", sim_dir, dirs_exist_ok=True)
+            shutil.copytree(entry / "vhdl", sim_dir / "vhdl", dirs_exist_ok=True)
+
+        return sources_in(sim_dir)
+
     def __init__(
         self,
         entity: type[Entity],
@@ -94,7 +214,10 @@ class Simulator(_BaseSimulator):
         cast_vectors=None,
         extra_env: dict[str, str] | None = None,
         extra_vhdl_files: list[str] = None,
-        use_build_cache: bool = False,
+        use_build_cache: bool = True,
+        artifact_store: ArtifactStore | str | None = None,
+        vhdl_libraries: list[VhdlLibrary] | None = None,
+        write_build_report: bool = False,
         cocotb_extra_args: dict[str, str] | None = None,
     ):
         p = _GenericParams(
@@ -108,13 +231,28 @@ class Simulator(_BaseSimulator):
             extra_env=extra_env,
             extra_vhdl_files=extra_vhdl_files,
             use_build_cache=use_build_cache,
+            artifact_store=artifact_store,
+            vhdl_libraries=vhdl_libraries,
+            write_build_report=write_build_report,
         )
 
         super().__init__(p)
         self._init_impl(p, cocotb_extra_args=cocotb_extra_args)
 
     async def wait(self, duration: std.Duration, /):
-        await Timer(int(duration.picoseconds()), units="ps")
+        await Timer(round(duration.picoseconds()), units="ps")
+
+    async def wait_until(self, time: std.Duration | int, /):
+        if isinstance(time, std.Duration):
+            time = round(time.picoseconds())
+
+        delay = time - self.now()
+
+        if delay > 0:
+            await Timer(delay, units="ps")
+
+    def now(self):
+        return round(get_sim_time("ps"))
 
     async def delta_step(self):
         await Timer(1, units="step")
@@ -154,8 +292,45 @@ class Simulator(_BaseSimulator):
     def start_soon(self, coro, /):
         return Task(cocotb.start_soon(coro))
 
+    async def first(self, *awaitables):
+        if len(awaitables) == 0:
+            return None
+
+        async def indexed(index, awaitable):
+            await awaitable
+            return index
+
+        tasks = [
+            cocotb.start_soon(indexed(index, awaitable))
+            for index, awaitable in enumerate(awaitables)
+        ]
+
+        index = await First(*tasks)
+
+        for task in tasks:
+            if not task.done():
+                task.kill()
+
+        return index
+
+    async def all(self, *awaitables):
+        tasks = [cocotb.start_soon(awaitable) for awaitable in awaitables]
+
+        await Combine(*tasks)
+        return [task.result() for task in tasks]
+
+    async def with_timeout(self, awaitable, duration: std.Duration, /):
+        # cocotb raises SimTimeoutError, a subclass of TimeoutError,
+        # and kills the coroutine
+        return await cocotb_with_timeout(awaitable, round(duration.picoseconds()), "ps")
+
     def gen_clock(
-        self, clk, period_or_frequency: std.Duration = None, /, start_state=False
+        self,
+        clk,
+        period_or_frequency: std.Duration = None,
+        /,
+        start_state=False,
+        phase: std.Duration | None = None,
     ):
         if isinstance(clk, std.Clock):
             if period_or_frequency is None:
@@ -167,10 +342,35 @@ class Simulator(_BaseSimulator):
 
         period = period_or_frequency.period()
 
-        half = int(period.picoseconds()) // 2
+        half = round(period.picoseconds()) // 2
+        delay = 0 if phase is None else round(phase.picoseconds())
+
+        if clk._is_root() and issubclass(clk._type, Bit):
+            # cocotb drives the port directly, without the overhead
+            # of ProxyPort assignments. Clock.start is still a Python
+            # coroutine, that is resumed on each edge.
+            clock = Clock(clk._cocotb_port, 2 * half, units="ps")
+
+            async def native_thread():
+                nonlocal clk
+
+                clk <<= start_state
+
+                if delay != 0:
+                    await Timer(delay, units="ps")
+
+                await clock.start(start_high=bool(start_state))
+
+            self.start_soon(native_thread())
+            return
 
         async def thread():
             nonlocal clk
+
+            if delay != 0:
+                clk <<= start_state
+                await Timer(delay, units="ps")
+
             while True:
                 clk <<= start_state
                 await Timer(half, units="ps")
@@ -1,6 +1,8 @@
 from cohdl import Entity, Signal
 
 from ._base_simulation import _BaseSimulator
+from ._artifact_store import ArtifactStore
+from ._vhdl_library import VhdlLibrary
 
 class Simulator(_BaseSimulator):
     def __init__(
@@ -16,6 +18,10 @@ class Simulator(_BaseSimulator):
         simulator: str = "ghdl",
         sim_args: list[str] | None = None,
         extra_env: dict[str, str] | None = None,
+        use_build_cache: bool = True,
+        artifact_store: ArtifactStore | str | None = None,
+        vhdl_libraries: list[VhdlLibrary] | None = None,
+        write_build_report: bool = False,
         cocotb_extra_args: dict[str, str] | None = None,
     ):
         """
@@ -28,8 +34,21 @@ class Simulator(_BaseSimulator):
         * `vhdl_dir` name of directory inside build_dir where generated VHDL files are written
         * `extra_vhdl_files` list of paths to additional VHDL files
         * `extra_vhdl_files_post` like `extra_vhdl_files` but arguments are analyzed after CoHDL entities
+        * `vhdl_libraries` list of VhdlLibrary objects, the files of each library are analyzed
+                            into a separate VHDL library with the given name
         * `cast_vectors` when set to cohdl.Signed or cohdl.Unsigned all BitVector ports are converted
                             to the corresponding type
+        * `use_build_cache` (enabled by default) the VHDL code of `entity` is generated in
+                            every run, the files in `vhdl_dir` are only rewritten if a hash of
+                            all build inputs (generated VHDL, extra VHDL files, top level ports
+                            and simulator version) differs from the previous build. When disabled, the hash is
+                            not checked and the cache file is rewritten in every run. Unlike in
+                            earlier versions, enabling the cache never skips the generation of
+                            VHDL code, changes of the design are always picked up.
+        * `artifact_store` ArtifactStore or path of a store directory, the compiled design is
+                            kept in the store and shared between processes using the same design
+        * `write_build_report` when set, the duration of each build phase (`Simulator.build_report`)
+                            is written to `.build-report.json` in `build_dir`
 
         The following arguments are forwarded to cocotb:
 
@@ -0,0 +1,105 @@
+import os
+import json
+import hashlib
+import shutil
+import tempfile
+import subprocess
+
+from pathlib import Path
+
+from ._artifact_store import DEFAULT_STORE_DIR
+
+# Results of `<command> --version` are persisted between processes.
+# Entries are keyed by the PATH variable and the command name and
+# are only reused while the modification time of the resolved binary
+# is unchanged, so updated or replaced toolchains are probed again.
+PROBE_CACHE_FILE = "toolchain-probes.json"
+
+_probes: dict[str, str | None] = {}
+
+
+def _probe_cache_path() -> Path:
+    return Path(os.getenv("COHDL_SIM_CACHE", DEFAULT_STORE_DIR)).expanduser() / (
+        PROBE_CACHE_FILE
+    )
+
+
+def _load_probe_cache(path: Path) -> dict:
+    try:
+        with open(path) as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_probe_cache(path: Path, content: dict):
+    # the cache is only an optimization, unwritable locations are ignored
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # each writer (process or thread) uses its own temporary file,
+        # readers only ever see complete files
+        with tempfile.NamedTemporaryFile(
+            "w", dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False
+        ) as cache_file:
+            json.dump(content, cache_file, indent=2)
+
+        try:
+            os.replace(cache_file.name, path)
+        except OSError:
+            os.unlink(cache_file.name)
+            raise
+    except OSError:
+        pass
+
+
+def probe_version(command: str) -> str | None:
+    # return the output of `<command> --version`
+    # or None, when the command is not available or fails
+    search_path = hashlib.sha256(os.getenv("PATH", "").encode()).hexdigest()
+    key = f"{command}-{search_path[:16]}"
+
+    if key in _probes:
+        return _probes[key]
+
+    executable = shutil.which(command)
+
+    if executable is None:
+        _probes[key] = None
+        return None
+
+    executable = os.path.realpath(executable)
+    mtime = os.stat(executable).st_mtime_ns
+
+    cache_path = _probe_cache_path()
+    cache = _load_probe_cache(cache_path)
+    entry = cache.get(key)
+
+    if (
+        entry is not None
+        and entry["executable"] == executable
+        and entry["mtime"] == mtime
+    ):
+        _probes[key] = entry["version"]
+        return entry["version"]
+
+    result = subprocess.run(
+        [command, "--version"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+
+    version = result.stdout.decode() if result.returncode == 0 else None
+
+    # Read-modify-write without a lock, entries added by other processes
+    # meanwhile may be lost. That only causes another probe later.
+    cache[key] = {"executable": executable, "mtime": mtime, "version": version}
+    _write_probe_cache(cache_path, cache)
+
+    _probes[key] = version
+    return version
+
+
+def toolchain_version(command: str) -> str:
+    # the version string is part of the design hash,
+    # so updating the simulator invalidates the cache
+    version = probe_version(command)
+    return "" if version is None else version
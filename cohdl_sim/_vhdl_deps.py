@@ -0,0 +1,90 @@
+import re
+
+from dataclasses import dataclass
+
+_COMMENT = re.compile(r"--.*$", re.MULTILINE)
+
+_DECLARATION = re.compile(
+    r"^\s*(?:entity|package|configuration|context)\s+(\w+)\s+is\b",
+    re.IGNORECASE | re.MULTILINE,
+)
+_PACKAGE_BODY = re.compile(
+    r"^\s*package\s+body\s+(\w+)\s+is\b", re.IGNORECASE | re.MULTILINE
+)
+_ARCHITECTURE = re.compile(
+    r"^\s*architecture\s+\w+\s+of\s+(\w+)\s+is\b", re.IGNORECASE | re.MULTILINE
+)
+_WORK_REFERENCE = re.compile(r"\bwork\s*\.\s*(\w+)", re.IGNORECASE)
+# component declarations and instantiations refer to an entity by its name
+_COMPONENT = re.compile(r"^\s*component\s+(\w+)\b", re.IGNORECASE | re.MULTILINE)
+_INSTANTIATION = re.compile(
+    r"^\s*\w+\s*:\s*(?:component\s+)?(\w+)\s+(?:generic|port)\s+map\b",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+@dataclass
+class VhdlUnits:
+    declared: set[str]
+    referenced: set[str]
+
+
+def scan_units(content: str) -> VhdlUnits:
+    # Approximate the design units declared in and referenced by a VHDL file.
+    # This is not a VHDL parser but sufficient to order files generated
+    # by CoHDL and typical hand written packages.
+    content = _COMMENT.sub("", content)
+
+    declared = {name.lower() for name in _DECLARATION.findall(content)}
+
+    referenced = {
+        name.lower()
+        for pattern in (
+            _PACKAGE_BODY,
+            _ARCHITECTURE,
+            _WORK_REFERENCE,
+            _COMPONENT,
+            _INSTANTIATION,
+        )
+        for name in pattern.findall(content)
+    }
+
+    return VhdlUnits(declared=declared, referenced=referenced - declared)
+
+
+def dependency_graph(sources: dict[str, str]) -> dict[str, set[str]]:
+    # map each file to the set of files, that declare
+    # units referenced by it
+    units = {name: scan_units(content) for name, content in sources.items()}
+
+    declared_in = {}
+
+    for name, file_units in units.items():
+        for unit in file_units.declared:
+            declared_in[unit] = name
+
+    return {
+        name: {
+            declared_in[unit]
+            for unit in file_units.referenced
+            if unit in declared_in and declared_in[unit] != name
+        }
+        for name, file_units in units.items()
+    }
+
+
+def dependents(graph: dict[str, set[str]], changed: set[str]) -> set[str]:
+    # return all files that directly or indirectly depend on a changed file
+    # (the changed files are included in the result)
+    result = set(changed)
+    pending = list(changed)
+
+    while pending:
+        current = pending.pop()
+
+        for name, deps in graph.items():
+            if current in deps and name not in result:
+                result.add(name)
+                pending.append(name)
+
+    return result
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import hashlib
+
+from pathlib import Path
+
+
+class VhdlLibrary:
+    def __init__(
+        self,
+        name: str,
+        files: list[str],
+        *,
+        dependencies: list[VhdlLibrary] | None = None,
+    ):
+        assert name.lower() != "work", "the library name 'work' is reserved"
+
+        self.name = name.lower()
+        self.files = [str(file) for file in files]
+        self.dependencies = [] if dependencies is None else dependencies
+
+    def content_hash(self, toolchain: str) -> str:
+        # changes, when any file of this library or one of
+        # its dependencies is modified
+        h = hashlib.sha256()
+
+        for part in (self.name, toolchain):
+            h.update(part.encode())
+            h.update(b"\0")
+
+        for file in self.files:
+            h.update(Path(file).name.encode())
+            h.update(b"\0")
+            h.update(Path(file).read_bytes())
+            h.update(b"\0")
+
+        for dep in self.dependencies:
+            h.update(dep.content_hash(toolchain).encode())
+
+        return h.hexdigest()
+
+    def __repr__(self):
+        return f"VhdlLibrary({self.name!r}, {self.files!r})"
+
+
+def with_dependencies(libraries: list[VhdlLibrary]) -> list[VhdlLibrary]:
+    # return all libraries and their (indirect) dependencies,
+    # each library is placed after all libraries it depends on
+    result: list[VhdlLibrary] = []
+
+    def add(lib: VhdlLibrary):
+        if lib in result:
+            return
+
+        for dep in lib.dependencies:
+            add(dep)
+
+        assert all(
+            other.name != lib.name for other in result
+        ), f"multiple libraries with the name '{lib.name}'"
+
+        result.append(lib)
+
+    for lib in libraries:
+        add(lib)
+
+    return result
@@ -14,12 +14,12 @@ jupyter notebooks.
 """
 
 import os
-import subprocess
 
 assert os.name == "posix", "the ghdl_sim simulator is only supported in Linux"
 
-success, output = subprocess.getstatusoutput("ghdl-gcc --version")
-assert success == 0, "ghdl_sim requires `ghdl` and the ghdl backend `ghdl-gcc`"
+from ._ghdl_backend import find_ghdl_backend
+
+find_ghdl_backend()
 
 try:
     import cohdl_sim_ghdl_interface
@@ -27,8 +27,9 @@ except:
     raise AssertionError(
         "The internal module cohdl_sim_ghdl_interface is not installed.\n"
         "A possible reason for this error is, that the ghdl command was not available while `pip install cohdl_sim` was executed.\n"
-        "Try to install ghdl and ghdl-gcc and then reinstall cohdl_sim.\n"
+        "Try to install ghdl (with the llvm or gcc backend) and then reinstall cohdl_sim.\n"
     )
 
 
 from ._simulation import Simulator
+from ._build_simulation import build_simulations, SimulationBuild
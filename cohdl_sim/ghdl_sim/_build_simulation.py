@@ -1,77 +1,579 @@
 import os
+import json
 import shutil
+import hashlib
+import threading
+import contextvars
 import subprocess
+from dataclasses import dataclass
+from contextlib import contextmanager, ExitStack
+from functools import partial
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
+from cohdl import Entity
 
-def run_command(command, *args):
+from cohdl_sim._base_simulation import _GenericParams
+from cohdl_sim._artifact_store import ArtifactStore
+from cohdl_sim._build_report import BuildReport, record_subprocess
+from cohdl_sim._vhdl_library import VhdlLibrary, with_dependencies
+from cohdl_sim.ghdl_sim._ghdl_backend import find_ghdl_backend, code_generator
+from cohdl_sim._vhdl_deps import dependency_graph, dependents, scan_units
+from cohdl_sim._build_cache import (
+    generate_sources,
+    write_sources,
+    design_hash,
+    toolchain_version,
+    write_cache_file,
+    is_up_to_date,
+)
+
+# stores the hash and the declared design units of each analyzed file
+ANALYSIS_STATE_FILE = ".ghdl-analysis.json"
+
+WORK_LIBRARY_FILE = "work-obj93.cf"
+
+# Code generation options passed to GHDL (analysis and bind)
+# and additional options of the final gcc link step.
+# Most of the simulation time is spent in the generated design code,
+# long running simulations benefit from the optimized profiles.
+BUILD_PROFILES = {
+    "default": ([], []),
+    "fast": (["-O3"], ["-O3"]),
+    "fast-lto": (["-O3", "-flto"], ["-O3", "-flto"]),
+    "debug": (["-g"], ["-g"]),
+}
+
+
+def profile_options(build_profile: str, ghdl: str) -> tuple[list[str], list[str]]:
+    assert (
+        build_profile in BUILD_PROFILES
+    ), f"invalid build profile '{build_profile}', expected one of {list(BUILD_PROFILES)}"
+
+    codegen_options, link_options = BUILD_PROFILES[build_profile]
+
+    assert not (
+        "-flto" in codegen_options and code_generator(ghdl) != "gcc"
+    ), f"the build profile '{build_profile}' requires the gcc code generator of GHDL"
+
+    return codegen_options, link_options
+
+
+def run_command(command, *args, cwd=None):
     cmd_string = f"{command} {' '.join(str(arg) for arg in args)}"
 
-    result = subprocess.run([command, *args], stdout=subprocess.PIPE)
+    with subprocess.Popen([command, *args], stdout=subprocess.PIPE, cwd=cwd) as proc:
+        stdout = proc.stdout.read()
+
+        # wait4 reports the CPU time of this command only,
+        # other designs may be built concurrently
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+
+    record_subprocess(usage.ru_utime + usage.ru_stime)
 
-    if result.returncode != 0:
-        print(result.stderr)
-        print(result.stdout)
+    if proc.returncode != 0:
+        print(stdout)
         raise AssertionError(f"command failed: {cmd_string}")
 
-    return result.stdout.decode()
+    return stdout.decode()
+
+
+def _file_hash(content: bytes):
+    return hashlib.sha256(content).hexdigest()
+
+
+def _load_analysis_state(
+    path: Path, toolchain: str, options: list[str]
+) -> dict[str, dict] | None:
+    try:
+        with open(path) as state_file:
+            state = json.load(state_file)
+    except (OSError, ValueError):
+        return None
+
+    if state.get("toolchain") != toolchain or state.get("options") != options:
+        return None
+
+    return state["files"]
+
+
+def _write_analysis_state(
+    path: Path, toolchain: str, options: list[str], files: dict[str, dict]
+):
+    with open(path, "w") as state_file:
+        json.dump(
+            {"toolchain": toolchain, "options": options, "files": files},
+            state_file,
+            indent=2,
+        )
+
+
+def _outdated_files(
+    previous: dict[str, dict] | None, contents: dict[str, bytes]
+) -> list[str] | None:
+    # Returns the files, that have to be reanalyzed in analysis order.
+    # None is returned, when the work library has to be rebuilt from scratch.
+    if previous is None or not set(previous).issubset(contents):
+        return None
+
+    changed = {
+        name
+        for name, content in contents.items()
+        if name not in previous or previous[name]["hash"] != _file_hash(content)
+    }
+
+    graph = dependency_graph(
+        {name: content.decode(errors="replace") for name, content in contents.items()}
+    )
+    affected = dependents(graph, changed)
+
+    return [name for name in contents if name in affected]
+
+
+def _analysis_order(files: list[str], contents: dict[str, bytes]) -> list[str]:
+    # Sort files, so each file is analyzed after the files declaring
+    # the units it references. Files without dependencies between
+    # them keep their given order.
+    graph = dependency_graph(
+        {name: contents[name].decode(errors="replace") for name in files}
+    )
+
+    order = []
+    done = set()
+    remaining = list(files)
+
+    while remaining:
+        ready = [name for name in remaining if graph[name].issubset(done)]
+
+        if len(ready) == 0:
+            # cyclic dependencies are not resolvable,
+            # analyze the rest in the given order
+            order.extend(remaining)
+            break
+
+        order.extend(ready)
+        done.update(ready)
+        remaining = [name for name in remaining if name not in done]
+
+    return order
 
 
 def prepare_ghdl_simulation(
-    vhdl_sources: list[str], top_module: str, build_dir=Path, copy_files=False
+    vhdl_sources: list[str],
+    top_module: str,
+    build_dir=Path,
+    copy_files=False,
+    incremental=False,
+    library_dirs: list[Path] = (),
+    report: BuildReport | None = None,
+    build_profile: str = "default",
+    ghdl_backend: str | None = None,
 ) -> Path:
-    status, _ = subprocess.getstatusoutput("ghdl-gcc --version")
-    assert status == 0, "the ghdl_sim simulator requires the ghdl backend ghdl-gcc"
+    build_dir = Path(build_dir)
+    report = BuildReport() if report is None else report
 
-    vhdl_names = []
+    # gcc and llvm backends produce object files, that are
+    # linked into a shared library exporting `ghdl_main`
+    ghdl = find_ghdl_backend(ghdl_backend)
+    toolchain = toolchain_version(ghdl)
+    codegen_options, link_options = profile_options(build_profile, ghdl)
+
+    # make precompiled libraries visible to all GHDL commands,
+    # the options are stored in the analysis state so changing
+    # the build profile triggers a full rebuild
+    options = [
+        *codegen_options,
+        *[f"-P{Path(lib_dir).absolute()}" for lib_dir in library_dirs],
+    ]
+
+    contents: dict[str, bytes] = {}
 
     for source_path in vhdl_sources:
         file_name = Path(source_path).name
-        vhdl_names.append(file_name)
+        content = Path(source_path).read_bytes()
+        contents[file_name] = content
 
         if copy_files:
             target_path = build_dir / file_name
-            shutil.copyfile(source_path, target_path)
+
+            # only copy changed files to keep the modification time
+            if not target_path.exists() or target_path.read_bytes() != content:
+                target_path.write_bytes(content)
         else:
             assert Path(source_path).parent == build_dir
 
-    curdir = Path(os.curdir).absolute()
+    out_path = (build_dir / f"lib{top_module}.so").absolute()
+
+    # All commands run with `build_dir` as their working directory.
+    # The current directory of the Python process is never changed
+    # so multiple designs can be built concurrently.
+    outdated = None
+
+    if incremental:
+        outdated = _outdated_files(
+            _load_analysis_state(build_dir / ANALYSIS_STATE_FILE, toolchain, options),
+            contents,
+        )
+
+    if outdated is None:
+        # remove units of previous builds from the work library
+        # so deleted or renamed files leave nothing behind
+        if (build_dir / WORK_LIBRARY_FILE).exists():
+            run_command(ghdl, "--remove", cwd=build_dir)
+
+        outdated = list(contents)
+
+    if len(outdated) == 0 and out_path.exists():
+        # no unit changed, the previously linked library is still valid
+        return out_path
+
+    if len(outdated) != 0:
+        # the previous library does not match the new sources,
+        # it must not be reused when the build is interrupted
+        out_path.unlink(missing_ok=True)
+
+        with report.phase("analyze", files=[build_dir / name for name in outdated]):
+            # GHDL updates the library file of the work library after each
+            # analyzed file, so the files of one library are analyzed sequentially
+            run_command(
+                ghdl,
+                "-a",
+                *options,
+                *_analysis_order(outdated, contents),
+                cwd=build_dir,
+            )
+
+    with report.phase("bind"):
+        run_command(ghdl, "--bind", *options, top_module, cwd=build_dir)
+
+    with report.phase("list-link"):
+        list_link = run_command(
+            ghdl, "--list-link", *options, top_module, cwd=build_dir
+        ).split()
+
+    version_script_path = None
+    filtered_list_link = []
+
+    VERSION_SCRIPT_PREFIX = "-Wl,--version-script="
+
+    for arg in list_link:
+        if arg.startswith(VERSION_SCRIPT_PREFIX):
+            version_script_path = build_dir / arg.removeprefix(VERSION_SCRIPT_PREFIX)
+        else:
+            filtered_list_link.append(arg)
+
+    # generate a modified version-script to make the symbol
+    # `ghdl_main` globally visible
+    local_version_script = "version-script.ver"
+
+    with open(build_dir / local_version_script, "w+") as local_file:
+        with open(version_script_path) as original_file:
+            for line in original_file:
+                print(line, file=local_file, end="")
+
+                if "global:" in line:
+                    print("ghdl_main;", file=local_file)
+
+    list_link = filtered_list_link + [f"{VERSION_SCRIPT_PREFIX}{local_version_script}"]
+
+    with report.phase("link", files=[out_path]):
+        run_command(
+            "gcc",
+            *link_options,
+            *list_link,
+            "-Wl,-shared,-fPIC",
+            f"-o{out_path.name}",
+            cwd=build_dir,
+        )
+
+    # the analysis state is only written after the library was linked,
+    # a failed bind or link step is repeated in the next build
+    _write_analysis_state(
+        build_dir / ANALYSIS_STATE_FILE,
+        toolchain,
+        options,
+        {
+            name: {
+                "hash": _file_hash(content),
+                "units": sorted(scan_units(content.decode(errors="replace")).declared),
+            }
+            for name, content in contents.items()
+        },
+    )
+
+    return out_path
+
+
+@contextmanager
+def prepare_vhdl_libraries(
+    libraries: list[VhdlLibrary],
+    store: ArtifactStore,
+    ghdl: str,
+    build_profile: str = "default",
+    analysis_jobs: int = 1,
+):
+    # Analyze each library into its own directory in the store.
+    # The directories are keyed by the content hash of the library,
+    # so unchanged libraries are only analyzed once. Libraries, that
+    # do not depend on each other, are analyzed concurrently.
+    # Yields the library directories, they are locked in the store
+    # until the context exits (after the design is linked).
+    toolchain = toolchain_version(ghdl)
+    codegen_options, _ = profile_options(build_profile, ghdl)
+
+    keys = {
+        lib.name: f"vhdl_lib-{lib.name}-{build_profile}-{lib.content_hash(toolchain)}"
+        for lib in with_dependencies(libraries)
+    }
+    library_dirs = {name: store.entry(key).absolute() for name, key in keys.items()}
+
+    def analyze(lib: VhdlLibrary, entry: Path):
+        run_command(
+            ghdl,
+            "-a",
+            f"--work={lib.name}",
+            *codegen_options,
+            *[f"-P{library_dirs[dep.name]}" for dep in lib.dependencies],
+            *[str(Path(file).absolute()) for file in lib.files],
+            cwd=entry,
+        )
+
+    def build(lib: VhdlLibrary):
+        with store.acquire(keys[lib.name], partial(analyze, lib)):
+            pass
+
+    with ExitStack() as held, ThreadPoolExecutor(max(analysis_jobs, 1)) as pool:
+        remaining = with_dependencies(libraries)
+        done = set()
+
+        while remaining:
+            level = [
+                lib
+                for lib in remaining
+                if all(dep.name in done for dep in lib.dependencies)
+            ]
+
+            if analysis_jobs > 1 and len(level) > 1:
+                # the context is copied, so the CPU time
+                # of the jobs is added to the active phase
+                futures = [
+                    pool.submit(contextvars.copy_context().run, build, lib)
+                    for lib in level
+                ]
+
+                for future in futures:
+                    future.result()
+
+            # keep the libraries locked, while dependent
+            # libraries and the design are analyzed
+            for lib in level:
+                held.enter_context(store.acquire(keys[lib.name], partial(analyze, lib)))
+
+            done.update(lib.name for lib in level)
+            remaining = [lib for lib in remaining if lib.name not in done]
+
+        yield list(library_dirs.values())
+
+
+def _copy_from_store(source: Path, target: Path):
+    # Hard links keep the file alive, when the store entry is evicted.
+    # Copy the file, when the store is on a different file system.
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}")
 
     try:
-        os.chdir(build_dir)
-        run_command("ghdl-gcc", "-a", *vhdl_names)
-        run_command("ghdl-gcc", "--bind", top_module)
-        list_link = run_command("ghdl-gcc", "--list-link", top_module).split()
+        os.link(source, tmp)
+    except OSError:
+        shutil.copy2(source, tmp)
+
+    os.replace(tmp, target)
+
+
+# CoHDL elaboration modifies global state (for example dynamic ports),
+# only the GHDL steps of different designs run concurrently
+_elaboration_lock = threading.Lock()
+
+
+@dataclass
+class SimulationBuild:
+    entity: type[Entity]
+    top_name: str
+    simlib: Path
+    design_hash: str
+    report: BuildReport
+
+
+def build_simulation(p: _GenericParams, analysis_jobs: int = 1) -> SimulationBuild:
+    assert p.simulator == "ghdl", "cohdl_sim.ghdl_sim only supports the ghdl simulator"
+
+    assert (
+        p.sim_dir == p.vhdl_dir
+    ), "cohdl_sim.ghdl_sim requires `sim_dir` and `vhdl_dir` to be the same"
+
+    top_name = p.entity._cohdl_info.name
+    ghdl = find_ghdl_backend(p.ghdl_backend)
+    toolchain = toolchain_version(ghdl)
+    report = BuildReport()
+
+    # precompiled libraries are locked in the store
+    # until the design is analyzed and linked
+    with ExitStack() as held:
+        with report.phase(
+            "libraries", files=[f for lib in p.vhdl_libraries for f in lib.files]
+        ):
+            library_dirs = held.enter_context(
+                prepare_vhdl_libraries(
+                    p.vhdl_libraries,
+                    (
+                        p.artifact_store
+                        if p.artifact_store is not None
+                        else ArtifactStore(p.build_dir / "vhdl_libs")
+                    ),
+                    ghdl,
+                    p.build_profile,
+                    analysis_jobs=analysis_jobs,
+                )
+            )
+
+        with _elaboration_lock:
+            with report.phase("elaboration"):
+                sources = generate_sources(p.entity, p.vhdl_dir)
+
+            current_hash = design_hash(
+                p.entity,
+                sources,
+                p.extra_vhdl_files,
+                p.extra_vhdl_files_post,
+                toolchain,
+                libraries=p.vhdl_libraries,
+                build_profile=p.build_profile,
+            )
+
+        vhdl_sources = p.extra_vhdl_files + list(sources) + p.extra_vhdl_files_post
+
+        simlib = (p.sim_dir / f"lib{top_name}.so").absolute()
+
+        if p.artifact_store is not None:
+            with report.phase("write", files=sources):
+                write_sources(sources)
+
+            # the linked simulation is shared with other processes
+            # and test sessions building the same design
+            def build_in_store(entry: Path):
+                prepare_ghdl_simulation(
+                    vhdl_sources,
+                    top_name,
+                    entry,
+                    copy_files=True,
+                    library_dirs=library_dirs,
+                    report=report,
+                    build_profile=p.build_profile,
+                    ghdl_backend=ghdl,
+                )
+
+            with p.artifact_store.acquire(
+                f"ghdl_sim-{current_hash}", build_in_store
+            ) as entry:
+                # the simulation is loaded from the local directory,
+                # so it remains valid when the store entry is evicted
+                simlib = (p.sim_dir / f"lib{top_name}-store.so").absolute()
+                _copy_from_store(entry / f"lib{top_name}.so", simlib)
+
+            write_cache_file(
+                p.cache_file, p.entity, vhdl_sources, current_hash, [simlib]
+            )
+        elif not (
+            p.use_build_cache and is_up_to_date(p.cache_file, current_hash, [simlib])
+        ):
+            with report.phase("write", files=sources):
+                write_sources(sources)
+
+            simlib = prepare_ghdl_simulation(
+                vhdl_sources,
+                top_name,
+                p.sim_dir,
+                copy_files=False,
+                incremental=p.use_build_cache,
+                library_dirs=library_dirs,
+                report=report,
+                build_profile=p.build_profile,
+                ghdl_backend=ghdl,
+            )
+
+            write_cache_file(
+                p.cache_file, p.entity, vhdl_sources, current_hash, [simlib]
+            )
+
+    if p.write_build_report:
+        report.write_json(p.report_file)
+
+    return SimulationBuild(
+        entity=p.entity,
+        top_name=top_name,
+        simlib=simlib,
+        design_hash=current_hash,
+        report=report,
+    )
+
+
+# keyword arguments of ghdl_sim.Simulator, that only affect
+# running the simulation and are ignored by build_simulations
+_RUN_OPTIONS = ("max_sim_time", "max_wall_time", "max_idle_cycles")
+
+
+def build_simulations(
+    designs: list[type[Entity] | dict],
+    *,
+    max_workers: int | None = None,
+    build_dir: str = "build",
+    analysis_jobs: int = 1,
+    **kwargs,
+) -> list[SimulationBuild]:
+    """
+    Build simulations for multiple designs concurrently.
 
-        version_script_path = None
-        filtered_list_link = []
+    Each design is either an entity type or a dict of keyword arguments
+    accepted by `ghdl_sim.Simulator` (including `entity`). Keyword arguments
+    passed to this function apply to all designs. Unless specified otherwise,
+    each design is built in `{build_dir}/{entity name}`.
+    `analysis_jobs` can be set per design, the watchdog limits
+    (`max_sim_time`, `max_wall_time` and `max_idle_cycles`) only apply
+    to running simulations and are ignored. `build` is not accepted.
 
-        VERSION_SCRIPT_PREFIX = "-Wl,--version-script="
+    The result contains one SimulationBuild per design (in the same order),
+    that can be passed to `ghdl_sim.Simulator` via its `build` argument.
+    """
 
-        for arg in list_link:
-            if arg.startswith(VERSION_SCRIPT_PREFIX):
-                version_script_path = Path(arg.removeprefix("-Wl,--version-script="))
-            else:
-                filtered_list_link.append(arg)
+    params = []
 
-        # generate a modified version-script to make the symbol
-        # `ghdl_main` globally visible
-        local_version_script = "version-script.ver"
+    for design in designs:
+        options = {
+            "analysis_jobs": analysis_jobs,
+            **kwargs,
+            **(design if isinstance(design, dict) else {"entity": design}),
+        }
 
-        with open(local_version_script, "w+") as local_file:
-            with open(version_script_path) as original_file:
-                for line in original_file:
-                    print(line, file=local_file, end="")
+        assert "build" not in options, "build_simulations does not accept `build`"
 
-                    if "global:" in line:
-                        print("ghdl_main;", file=local_file)
+        for name in _RUN_OPTIONS:
+            options.pop(name, None)
 
-        list_link = filtered_list_link + ["-Wl,--version-script=version-script.ver"]
+        jobs = options.pop("analysis_jobs")
 
-        out_name = f"lib{top_module}.so"
+        options.setdefault(
+            "build_dir", str(Path(build_dir) / options["entity"]._cohdl_info.name)
+        )
+        params.append((_GenericParams(**options), jobs))
 
-        run_command("gcc", *list_link, "-Wl,-shared,-fPIC", f"-o{out_name}")
+    build_dirs = [p.build_dir.absolute() for p, _ in params]
+    assert len(set(build_dirs)) == len(
+        build_dirs
+    ), "each design must be built in a separate build directory"
 
-        return Path(out_name).absolute()
-    finally:
-        os.chdir(curdir)
+    with ThreadPoolExecutor(max_workers) as pool:
+        return list(
+            pool.map(
+                lambda param: build_simulation(param[0], analysis_jobs=param[1]),
+                params,
+            )
+        )
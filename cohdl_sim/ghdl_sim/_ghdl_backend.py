@@ -0,0 +1,44 @@
+from functools import cache
+
+from cohdl_sim._toolchain import probe_version
+
+# GHDL executables checked during automatic backend detection.
+# ghdl_sim links the analyzed design into a shared library, this requires
+# a code generator that produces object files (gcc or llvm, not mcode).
+# ghdl-llvm is preferred because it compiles considerably faster than ghdl-gcc.
+GHDL_BACKENDS = ("ghdl-llvm", "ghdl-gcc", "ghdl")
+
+
+def code_generator(command: str) -> str | None:
+    # `ghdl --version` names the code generator of the installation
+    version = probe_version(command)
+
+    if version is not None:
+        for generator in ("llvm", "gcc", "mcode"):
+            if generator in version.lower():
+                return generator
+
+    return None
+
+
+def is_supported_backend(command: str) -> bool:
+    return code_generator(command) in ("llvm", "gcc")
+
+
+@cache
+def find_ghdl_backend(preferred: str | None = None) -> str:
+    # return the name of the GHDL executable used to build simulations
+    if preferred is not None:
+        assert is_supported_backend(
+            preferred
+        ), f"the GHDL backend '{preferred}' is not available or uses the mcode code generator"
+        return preferred
+
+    for command in GHDL_BACKENDS:
+        if is_supported_backend(command):
+            return command
+
+    raise AssertionError(
+        "ghdl_sim requires a GHDL installation with the llvm or gcc code generator "
+        f"(one of the commands {', '.join(GHDL_BACKENDS)})"
+    )
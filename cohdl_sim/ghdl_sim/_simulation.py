@@ -1,17 +1,46 @@
 from __future__ import annotations
 
-from cohdl import Entity, Port, BitVector, Unsigned, Signed, Null
+from cohdl import Entity, Port, Bit, BitVector, Unsigned, Signed, Null
 from cohdl import std
 
 from pathlib import Path
 from functools import partial
-from ._build_simulation import prepare_ghdl_simulation
+from ._build_simulation import build_simulation, SimulationBuild
 from ._proxy_port import ProxyPort
 from .._base_simulation import _GenericParams, _BaseSimulator
+from .._artifact_store import ArtifactStore
+from .._vhdl_library import VhdlLibrary
+from .._condition import Condition, Equals, AllOf, AnyOf, Not, as_condition
+from .._cycle import _CyclePorts, CycleHandle
 
 import os
+import time
 
-from cohdl_sim_ghdl_interface import GhdlInterface
+from collections import deque
+
+from cohdl_sim_ghdl_interface import GhdlInterface, SignalEdge
+from cohdl_sim_ghdl_interface import Condition as NativeCondition
+
+
+def _compile_condition(condition: Condition):
+    # translate a condition into its representation in the simulator interface
+    match condition:
+        case Equals():
+            return NativeCondition.equals(
+                condition.port._handle, condition.offset, condition.value
+            )
+        case AllOf():
+            return NativeCondition.all_of(
+                [_compile_condition(cond) for cond in condition.conditions]
+            )
+        case AnyOf():
+            return NativeCondition.any_of(
+                [_compile_condition(cond) for cond in condition.conditions]
+            )
+        case Not():
+            return NativeCondition.negate(_compile_condition(condition.condition))
+        case _:
+            raise AssertionError(f"unsupported condition {condition}")
 
 
 class _Suspend:
@@ -21,62 +50,56 @@ class _Suspend:
 
 _suspend = _Suspend()
 
-global_alive_list = []
-
-
-# ugly workaround to keep python objects referenced in the simulator alive
-def _keep_alive(i):
-    global_alive_list.append(i)
-    return i
-
 
 class Task:
     def __init__(self, simulator: Simulator):
         self._sim = simulator
         self._done = False
-        self._continuation = None
+        # coroutines waiting in join(), rescheduled when the task is done
+        self._joiners = []
+
+    def _remove_joiner(self, coro):
+        if coro in self._joiners:
+            self._joiners.remove(coro)
 
     async def join(self):
-        self._continuation = self._sim._current_coro
-        while not self._done:
+        if not self._done:
+            coro = self._sim._current_coro
+            self._joiners.append(coro)
+            self._sim._cancellable(self._remove_joiner, coro)
             await _suspend
 
 
 class Simulator(_BaseSimulator):
 
-    def _init_impl(self, p: _GenericParams):
-        from cohdl_sim._build_cache import write_cache_file, load_cache_file
-
-        assert (
-            p.simulator == "ghdl"
-        ), "cohdl_sim.ghdl_sim only supports the ghdl simulator"
-
-        assert (
-            p.sim_dir == p.vhdl_dir
-        ), "cohdl_sim.ghdl_sim requires `sim_dir` and `vhdl_dir` to be the same"
-
+    def _init_impl(
+        self,
+        p: _GenericParams,
+        analysis_jobs: int = 1,
+        build: SimulationBuild | None = None,
+        max_sim_time: std.Duration | None = None,
+        max_wall_time: float | None = None,
+        max_idle_cycles: int | None = None,
+    ):
         # ghdl_sim executes in the current context
         # set extra-env locally
         for name, val in p.extra_env.items():
             os.environ[name] = val
 
-        top_name = p.entity._cohdl_info.name
-        self._entity = p.entity
-        self._top_name = top_name
-
-        if not p.use_build_cache:
-            lib = std.VhdlCompiler.to_vhdl_library(p.entity)
-            vhdl_sources = (
-                p.extra_vhdl_files + lib.write_dir(p.vhdl_dir) + p.extra_vhdl_files_post
-            )
-            write_cache_file(p.cache_file, p.entity, vhdl_sources=vhdl_sources)
+        if build is None:
+            build = build_simulation(p, analysis_jobs=analysis_jobs)
         else:
-            cache_content = load_cache_file(p.cache_file, p.entity)
-            vhdl_sources = cache_content.vhdl_sources
+            assert (
+                build.entity is p.entity
+            ), "the given build was created for a different entity"
 
-        self._simlib = prepare_ghdl_simulation(
-            vhdl_sources, top_name, p.sim_dir, copy_files=False
-        )
+        self._entity = p.entity
+        self._top_name = build.top_name
+        self._simlib = build.simlib
+
+        self.build_report = build.report
+        self._report_file = p.report_file if p.write_build_report else None
+        self._startup_begin = None
 
         self._sim = GhdlInterface()
         self._sim_args = p.sim_args
@@ -85,6 +108,39 @@ class Simulator(_BaseSimulator):
         self._current_coro = None
         self._port_bv = p.cast_vectors
 
+        # coroutines ready to resume in the current simulator callback
+        self._ready = deque()
+        self._draining = False
+
+        # branches of first/all/with_timeout mapped to a function,
+        # that cancels the pending wait of the branch
+        self._cancel_wait = {}
+
+        # Pending waits are registered in the simulator interface
+        # with a resume slot (an index into `_slots`). Slots are reused,
+        # so waiting does not create new callback objects.
+        self._slots = []
+        self._free_slots = []
+
+        # ids of the clocks started by gen_clock in the simulator interface,
+        # mapped to the handle of the driven port
+        self._native_clocks = {}
+
+        # handles returned by on_cycle for native cycle callbacks,
+        # the ids are only valid until the end of the current test
+        self._cycle_handles = []
+
+        # Limits of each test, checked by the simulator interface.
+        # The interface is shared by all simulators of the process,
+        # so the limits are passed to it at the start of each test.
+        self._watchdog = dict(
+            max_sim_time=(
+                0 if max_sim_time is None else round(max_sim_time.picoseconds())
+            ),
+            max_wall_time=0.0 if max_wall_time is None else max_wall_time,
+            max_idle_cycles=0 if max_idle_cycles is None else max_idle_cycles,
+        )
+
     def __init__(
         self,
         entity: type[Entity],
@@ -98,7 +154,17 @@ class Simulator(_BaseSimulator):
         extra_env: dict[str, str] | None = None,
         extra_vhdl_files: list[str] = None,
         extra_vhdl_files_post: list[str] = None,
-        use_build_cache: bool = False,
+        use_build_cache: bool = True,
+        artifact_store: ArtifactStore | str | None = None,
+        vhdl_libraries: list[VhdlLibrary] | None = None,
+        write_build_report: bool = False,
+        build_profile: str = "default",
+        ghdl_backend: str | None = None,
+        analysis_jobs: int = 1,
+        build: SimulationBuild | None = None,
+        max_sim_time: std.Duration | None = None,
+        max_wall_time: float | None = None,
+        max_idle_cycles: int | None = None,
     ):
         p = _GenericParams(
             entity=entity,
@@ -112,12 +178,44 @@ class Simulator(_BaseSimulator):
             extra_vhdl_files=extra_vhdl_files,
             extra_vhdl_files_post=extra_vhdl_files_post,
             use_build_cache=use_build_cache,
+            artifact_store=artifact_store,
+            vhdl_libraries=vhdl_libraries,
+            write_build_report=write_build_report,
+            build_profile=build_profile,
+            ghdl_backend=ghdl_backend,
         )
 
         super().__init__(p)
-        self._init_impl(p)
+        self._init_impl(
+            p,
+            analysis_jobs=analysis_jobs,
+            build=build,
+            max_sim_time=max_sim_time,
+            max_wall_time=max_wall_time,
+            max_idle_cycles=max_idle_cycles,
+        )
+
+    def _report_startup(self):
+        # the startup of the first test is added to the build report,
+        # ghdl_main elaborates the design before the first callback runs
+        load_wall, load_cpu = self._sim.load_time()
+        wall_time = time.perf_counter() - self._startup_begin[0]
+        cpu_time = time.process_time() - self._startup_begin[1]
+
+        self.build_report.add("dlopen", load_wall, load_cpu, files=[self._simlib])
+        self.build_report.add(
+            "ghdl_main", wall_time - load_wall, max(cpu_time - load_cpu, 0.0)
+        )
+
+        if self._report_file is not None:
+            self.build_report.write_json(self._report_file)
+
+        self._startup_begin = None
 
     def _initial_fn(self):
+        if self._startup_begin is not None:
+            self._report_startup()
+
         self._input_ports = {}
         self._output_ports = {}
         self._inout_ports = {}
@@ -170,176 +268,463 @@ class Simulator(_BaseSimulator):
                 case Port.Direction.INOUT:
                     self._inout_ports[name] = proxy
 
-        self._continue(self._tb(EntityProxy()))
+        return EntityProxy()
+
+    async def _run_testbench(self):
+        await self._tb(self._initial_fn())
 
     def _startup_function(self):
-        # self._initial_fn()
-        # global_alive_list.append(self._sim.add_startup_function(self._initial_fn))
-        global_alive_list.append(self._sim.add_callback_delay(self._initial_fn, 0))
+        self._sim.add_timer(0, self._slot(self._run_testbench()))
+
+    def _slot(self, coro) -> int:
+        # reserve a resume slot for `coro`
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slots[slot] = coro
+            return slot
+
+        self._slots.append(coro)
+        return len(self._slots) - 1
+
+    def _release(self, slot: int):
+        self._slots[slot] = None
+        self._free_slots.append(slot)
+
+    def _resume(self, slot: int):
+        # called by the simulator interface, when the wait of `slot` is over
+        coro = self._slots[slot]
+        self._release(slot)
+
+        # the slot may be reused, so it must not be cancelled later
+        if coro in self._cancel_wait:
+            self._cancel_wait[coro] = None
+
+        self._continue(coro)
+
+    def _cancel_timer(self, slot: int):
+        self._sim.remove_timer(slot)
+        self._release(slot)
+
+    def _cancel_signal_waiter(self, handle, slot: int):
+        self._sim.remove_signal_waiter(handle, slot)
+        self._release(slot)
 
     def _continue(self, coro, name=None):
-        prev_coro = self._current_coro
-        self._current_coro = coro
+        # entry point of all simulator callbacks,
+        # resume `coro` and all coroutines that become ready meanwhile
+        self._ready.append(coro)
+
+        if not self._draining:
+            self._run_ready()
+
+    def _run_ready(self):
+        # Coroutines are resumed one after another from the ready queue.
+        # Resuming a coroutine never resumes another one recursively,
+        # so the stack depth does not depend on the number of tasks.
+        self._draining = True
 
         try:
-            coro.send(None)
-        except StopIteration:
-            pass
+            while self._ready:
+                coro = self._ready.popleft()
+
+                # a coroutine may be resumed by a callback
+                # registered before it finished or was closed
+                if coro.cr_frame is None:
+                    continue
+
+                self._current_coro = coro
 
-        self._current_coro = prev_coro
+                try:
+                    coro.send(None)
+                except StopIteration:
+                    pass
+        finally:
+            self._current_coro = None
+            self._draining = False
 
     def test(self, testbench, sim_args=None):
         async def tb_wrapper(entity):
             await testbench(entity)
             self._sim.finish_simulation()
+            # other coroutines are not resumed after the testbench is done
+            self._ready.clear()
 
         sim_args = sim_args if sim_args is not None else self._sim_args
 
         self._tb = tb_wrapper
+        self._ready.clear()
+        self._cancel_wait.clear()
+        self._slots.clear()
+        self._free_slots.clear()
+        self._native_clocks.clear()
+
+        for handle in self._cycle_handles:
+            handle.removed = True
+
+        self._cycle_handles.clear()
         self._sim.cleanup()
+        self._sim.set_resume_handler(self._resume)
 
-        global_alive_list.append(self._sim.add_startup_function(self._startup_function))
+        if not any(phase.name == "dlopen" for phase in self.build_report.phases):
+            self._startup_begin = (time.perf_counter(), time.process_time())
+
+        self._sim.add_startup_function(self._startup_function)
+        self._sim.set_watchdog(**self._watchdog)
         self._sim.start(str(self._simlib), sim_args)
         self._sim.stop()
 
-    async def _wait_picoseconds(self, picos: int):
-        with _keep_alive(
-            self._sim.add_callback_delay(
-                partial(self._continue, self._current_coro, name="picos"), picos
+        reason = self._sim.watchdog_reason()
+
+        if reason:
+            raise AssertionError(
+                f"watchdog stopped the simulation ({reason}), pending coroutines:\n"
+                + "\n".join(self._pending_coroutines())
             )
-        ):
-            await _suspend
+
+    @staticmethod
+    def _describe_coroutine(coro) -> str:
+        # chain of awaiting coroutines from the outermost to the innermost one
+        frames = []
+
+        while getattr(coro, "cr_frame", None) is not None:
+            frame = coro.cr_frame
+            frames.append(
+                f"{coro.__qualname__} ({frame.f_code.co_filename}:{frame.f_lineno})"
+            )
+            coro = coro.cr_await
+
+        return " -> ".join(frames)
+
+    def _pending_coroutines(self) -> list[str]:
+        # coroutines waiting for the simulator or ready to resume,
+        # coroutines waiting for other coroutines are part of their chain
+        pending = [coro for coro in self._slots if coro is not None]
+        pending.extend(self._ready)
+
+        return [
+            f"  {self._describe_coroutine(coro)}"
+            for coro in pending
+            if coro.cr_frame is not None
+        ]
+
+    def _cancellable(self, cancel, *args):
+        # called before the current coroutine is suspended,
+        # branches remember how to cancel the pending wait
+        if self._current_coro in self._cancel_wait:
+            self._cancel_wait[self._current_coro] = partial(cancel, *args)
+
+    async def _wait_picoseconds(self, picos: int):
+        # timers are owned by the simulator interface
+        # and released once they have fired
+        slot = self._slot(self._current_coro)
+        self._sim.add_timer(picos, slot)
+        self._cancellable(self._cancel_timer, slot)
+        await _suspend
 
     async def wait(self, duration: std.Duration):
-        await self._wait_picoseconds(int(duration.picoseconds()))
+        await self._wait_picoseconds(round(duration.picoseconds()))
+
+    async def wait_until(self, time: std.Duration | int, /):
+        if isinstance(time, std.Duration):
+            time = round(time.picoseconds())
+
+        # the simulator interface uses 64 bit delays,
+        # long waits are not split into multiple callbacks
+        delay = time - self._sim.sim_time()
+
+        if delay > 0:
+            await self._wait_picoseconds(delay)
+
+    def now(self):
+        # simulation time steps of GHDL are picoseconds
+        return self._sim.sim_time()
 
     async def delta_step(self):
-        with _keep_alive(
-            self._sim.add_callback_delay(partial(self._continue, self._current_coro), 1)
-        ):
-            await _suspend
+        await self._wait_picoseconds(1)
+
+    async def _signal_change(
+        self,
+        signal: ProxyPort,
+        edge=SignalEdge.CHANGE,
+        count: int = 1,
+        condition: NativeCondition | None = None,
+        sample_after: bool = False,
+    ):
+        # resume the current coroutine after the next change of the root signal,
+        # all coroutines waiting for the same signal share one VPI callback.
+        # With `sample_after` the condition is evaluated one simulation
+        # time step after each change.
+        handle = signal._root._handle
+        slot = self._slot(self._current_coro)
+
+        self._sim.add_signal_waiter(handle, slot, edge, count, condition, sample_after)
+        self._cancellable(self._cancel_signal_waiter, handle, slot)
+        await _suspend
+
+    @staticmethod
+    def _native_edges(signal: ProxyPort):
+        # edges of single bit ports are detected in the simulator interface,
+        # Python is only resumed on the requested transition
+        return signal._is_root() and issubclass(signal._type, Bit)
 
     async def rising_edge(self, signal: ProxyPort, /):
-        with self._sim.add_callback_value_change(
-            signal._root._handle,
-            partial(self._continue, self._current_coro, name="rising_edge"),
-        ):
-            prev_state = signal.copy()
+        if self._native_edges(signal):
+            return await self._signal_change(signal, SignalEdge.RISING)
 
-            while True:
-                await _suspend
-                new_state = signal.copy()
+        prev_state = signal.copy()
+
+        while True:
+            await self._signal_change(signal)
+            new_state = signal.copy()
 
-                if (not prev_state) and new_state:
-                    return
-                prev_state = new_state
+            if (not prev_state) and new_state:
+                return
+            prev_state = new_state
 
     async def falling_edge(self, signal: ProxyPort, /):
-        with self._sim.add_callback_value_change(
-            signal._root._handle,
-            partial(self._continue, self._current_coro, name="falling_edge"),
-        ):
-            prev_state = signal.copy()
+        if self._native_edges(signal):
+            return await self._signal_change(signal, SignalEdge.FALLING)
 
-            while True:
-                await _suspend
-                new_state = signal.copy()
+        prev_state = signal.copy()
 
-                if prev_state and not new_state:
-                    return
-                prev_state = new_state
+        while True:
+            await self._signal_change(signal)
+            new_state = signal.copy()
+
+            if prev_state and not new_state:
+                return
+            prev_state = new_state
 
     async def any_edge(self, signal: ProxyPort, /):
-        with self._sim.add_callback_value_change(
-            signal._root._handle,
-            partial(self._continue, self._current_coro, name="any_edge"),
-        ):
-            prev_state = signal.copy()
+        if self._native_edges(signal):
+            return await self._signal_change(signal)
 
-            while True:
-                await _suspend
-                new_state = signal.copy()
+        prev_state = signal.copy()
+
+        while True:
+            await self._signal_change(signal)
+            new_state = signal.copy()
 
-                if prev_state != new_state:
-                    return
-                prev_state = new_state
+            if prev_state != new_state:
+                return
+            prev_state = new_state
 
     async def clock_cycles(self, signal: ProxyPort, num_cycles: int, rising=True):
         if isinstance(signal, std.Clock):
             signal = signal.signal()
 
-        with self._sim.add_callback_value_change(
-            signal._root._handle, partial(self._continue, self._current_coro)
-        ):
-            prev_state = signal.copy()
+        if num_cycles <= 0:
+            return
+
+        if self._native_edges(signal):
+            # edges are counted in the simulator interface,
+            # Python is resumed once after the last cycle
+            return await self._signal_change(
+                signal, SignalEdge.RISING if rising else SignalEdge.FALLING, num_cycles
+            )
 
+        for _ in range(num_cycles):
             if rising:
-                while True:
-                    await _suspend
-                    new_state = signal.copy()
+                await self.rising_edge(signal)
+            else:
+                await self.falling_edge(signal)
 
-                    if (not prev_state) and new_state:
-                        num_cycles -= 1
-                        if num_cycles == 0:
-                            return
+    async def value_change(self, signal: ProxyPort):
+        await self._signal_change(signal)
 
-                    prev_state = new_state
-            else:
-                while True:
-                    await _suspend
-                    new_state = signal.copy()
+    async def value_true(self, signal: ProxyPort):
+        while not signal:
+            await self._signal_change(signal)
 
-                    if prev_state and not new_state:
-                        num_cycles -= 1
-                        if num_cycles == 0:
-                            return
+    async def value_false(self, signal: ProxyPort):
+        while signal:
+            await self._signal_change(signal)
 
-                    prev_state = new_state
+    async def _true_on_edge(
+        self, clk: ProxyPort, cond, edge, timeout: int | None, sample_after=False
+    ):
+        # Conditions on top level ports are evaluated in the simulator
+        # interface at each edge of `clk` (or one simulation time step
+        # after it, when `sample_after` is set). Returns False, when `cond`
+        # cannot be evaluated natively.
+        condition = as_condition(cond)
 
-    async def value_change(self, signal: ProxyPort):
-        with self._sim.add_callback_value_change(
-            signal._root._handle, partial(self._continue, self._current_coro)
+        if condition is None or not self._native_edges(clk):
+            return False
+
+        native = _compile_condition(condition)
+
+        if timeout is None:
+            await self._signal_change(
+                clk, edge, condition=native, sample_after=sample_after
+            )
+        else:
+            # both waiters are notified on the same edges, the condition
+            # is checked first and wins when it holds on the last edge
+            index = await self.first(
+                self._signal_change(
+                    clk, edge, condition=native, sample_after=sample_after
+                ),
+                self._signal_change(clk, edge, timeout + 1, sample_after=sample_after),
+            )
+
+            assert index == 0, "timeout while waiting for condition"
+
+        return True
+
+    async def true_on_rising(
+        self, clk: ProxyPort, cond, *, timeout: int | std.Duration | None = None
+    ):
+        if isinstance(timeout, std.Duration) or not await self._true_on_edge(
+            clk, cond, SignalEdge.RISING, timeout
         ):
-            await _suspend
-            return
+            await super().true_on_rising(clk, cond, timeout=timeout)
 
-    async def value_true(self, signal: ProxyPort):
-        with self._sim.add_callback_value_change(
-            signal._root._handle, partial(self._continue, self._current_coro)
+    async def true_on_falling(
+        self, clk: ProxyPort, cond, *, timeout: int | std.Duration | None = None
+    ):
+        if isinstance(timeout, std.Duration) or not await self._true_on_edge(
+            clk, cond, SignalEdge.FALLING, timeout
         ):
-            while not signal:
-                await _suspend
+            await super().true_on_falling(clk, cond, timeout=timeout)
 
-    async def value_false(self, signal: ProxyPort):
-        with self._sim.add_callback_value_change(
-            signal._root._handle, partial(self._continue, self._current_coro)
+    async def true_after_rising(
+        self, clk: ProxyPort, cond, *, timeout: int | std.Duration | None = None
+    ):
+        if isinstance(timeout, std.Duration) or not await self._true_on_edge(
+            clk, cond, SignalEdge.RISING, timeout, sample_after=True
         ):
-            while signal:
-                await _suspend
+            await super().true_after_rising(clk, cond, timeout=timeout)
+
+    async def true_after_falling(
+        self, clk: ProxyPort, cond, *, timeout: int | std.Duration | None = None
+    ):
+        if isinstance(timeout, std.Duration) or not await self._true_on_edge(
+            clk, cond, SignalEdge.FALLING, timeout, sample_after=True
+        ):
+            await super().true_after_falling(clk, cond, timeout=timeout)
+
+    async def _branches(self, awaitables, count: int):
+        # Run each awaitable in a branch of the current coroutine and
+        # resume once `count` branches are done (or one has failed).
+        # Pending waits of the remaining branches are cancelled, so
+        # no callbacks are left behind in the simulator interface.
+        parent = self._current_coro
+        results = [None] * len(awaitables)
+        done = []
+        error = None
+        resumed = False
+
+        async def branch(index, awaitable):
+            nonlocal error, resumed
+
+            try:
+                results[index] = await awaitable
+            except Exception as exc:
+                error = exc if error is None else error
+
+            done.append(index)
+
+            # the parent is resumed exactly once
+            if not resumed and (len(done) == count or error is not None):
+                resumed = True
+                self._ready.append(parent)
+
+        branches = [
+            branch(index, awaitable) for index, awaitable in enumerate(awaitables)
+        ]
+
+        for coro in branches:
+            self._cancel_wait[coro] = None
+            self._ready.append(coro)
+
+        try:
+            await _suspend
+        finally:
+            for coro in branches:
+                cancel = self._cancel_wait.pop(coro)
+
+                if coro.cr_frame is not None:
+                    if cancel is not None:
+                        cancel()
+                    coro.close()
+
+        if error is not None:
+            raise error
+
+        return done, results
+
+    async def first(self, *awaitables):
+        if len(awaitables) == 0:
+            return None
+
+        done, _ = await self._branches(awaitables, 1)
+        return done[0]
+
+    async def all(self, *awaitables):
+        if len(awaitables) == 0:
+            return []
+
+        _, results = await self._branches(awaitables, len(awaitables))
+        return results
+
+    async def with_timeout(self, awaitable, duration: std.Duration, /):
+        done, results = await self._branches([awaitable, self.wait(duration)], 1)
+
+        if done[0] != 0:
+            raise TimeoutError(f"timeout after {round(duration.picoseconds())} ps")
+
+        return results[0]
+
+    async def _run_task(self, task: Task, coro):
+        await coro
+        task._done = True
+
+        self._ready.extend(task._joiners)
+        task._joiners.clear()
 
     async def start(self, coro):
         task = self.start_soon(coro)
-        await self.delta_step()
+
+        # resume the current coroutine after the new task is suspended
+        self._ready.append(self._current_coro)
+        await _suspend
+
         return task
 
     def start_soon(self, coro):
-
+        # the task is started in the current time step,
+        # once the current coroutine is suspended
         task = Task(self)
+        self._ready.append(self._run_task(task, coro))
+        return task
 
-        async def inner():
-            await coro
-            task._done = True
+    def on_cycle(self, clk, fn, /, inputs=(), outputs=(), rising=True):
+        clk, rising = self._cycle_clock(clk, rising)
 
-            if task._continuation is not None:
-                self._continue(task._continuation)
+        if not self._native_edges(clk):
+            return super().on_cycle(
+                clk, fn, inputs=inputs, outputs=outputs, rising=rising
+            )
 
-        async def wrapper():
-            await self.delta_step()
-            self._continue(inner())
+        ports = _CyclePorts(inputs, outputs)
 
-        self._continue(wrapper())
+        # ports are sampled and driven in the simulator interface,
+        # `fn` is the only Python call per cycle
+        def cycle(binstrs):
+            return ports.binstrs(fn(*ports.values(binstrs)))
 
-        return task
+        cycle_id = self._sim.add_cycle_callback(
+            clk._handle,
+            rising,
+            [port._handle for port in ports.outputs],
+            [port._handle for port in ports.inputs],
+            cycle,
+        )
+
+        handle = CycleHandle(partial(self._sim.remove_cycle_callback, cycle_id))
+        self._cycle_handles.append(handle)
+        return handle
 
     def gen_clock(
         self,
@@ -347,6 +732,7 @@ class Simulator(_BaseSimulator):
         period_or_frequency: std.Duration = None,
         /,
         start_state=False,
+        phase: std.Duration | None = None,
     ):
         if isinstance(clk, std.Clock):
             if period_or_frequency is None:
@@ -358,11 +744,30 @@ class Simulator(_BaseSimulator):
 
         period = period_or_frequency.period()
 
-        half = int(period.picoseconds()) // 2
+        half = round(period.picoseconds()) // 2
+        delay = 0 if phase is None else round(phase.picoseconds())
+
+        if self._native_edges(clk):
+            # the clock is toggled by delay callbacks in the simulator interface,
+            # each clock is independent of all other clocks.
+            # A previous clock on the same port is replaced.
+            previous = self._native_clocks.get(clk._handle)
+
+            if previous is not None:
+                self._sim.stop_clock(previous)
+
+            self._native_clocks[clk._handle] = self._sim.start_clock(
+                clk._handle, half, half, bool(start_state), delay
+            )
+            return
 
         async def thread():
             nonlocal clk
 
+            if delay != 0:
+                clk <<= start_state
+                await self._wait_picoseconds(delay)
+
             while True:
                 clk <<= start_state
                 await self._wait_picoseconds(half)
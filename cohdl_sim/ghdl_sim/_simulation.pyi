@@ -1,4 +1,9 @@
 from cohdl import Entity
+from cohdl import std
+
+from .._artifact_store import ArtifactStore
+from .._vhdl_library import VhdlLibrary
+from ._build_simulation import SimulationBuild
 
 from .._base_simulation import _BaseSimulator
 
@@ -16,6 +21,17 @@ class Simulator(_BaseSimulator):
         simulator: str = "ghdl",
         sim_args: list[str] | None = None,
         extra_env: dict[str, str] | None = None,
+        use_build_cache: bool = True,
+        artifact_store: ArtifactStore | str | None = None,
+        vhdl_libraries: list[VhdlLibrary] | None = None,
+        write_build_report: bool = False,
+        build_profile: str = "default",
+        ghdl_backend: str | None = None,
+        analysis_jobs: int = 1,
+        build: SimulationBuild | None = None,
+        max_sim_time: std.Duration | None = None,
+        max_wall_time: float | None = None,
+        max_idle_cycles: int | None = None,
     ):
         """
         This is an alternative simulator that directly invokes GHDL without cocotb.
@@ -27,10 +43,43 @@ class Simulator(_BaseSimulator):
 
         ghdl_sim.Simulator is only available on Linux systems. ghdl must be installed
         before the cohdl_sim package because the FFI library is build during installation.
-        In addition the ghdl-gcc backend in required.
+        In addition a GHDL backend with the llvm or gcc code generator is required
+        (mcode is not supported).
 
         Differences to the default simulator:
 
         * `sim_dir` must be equal to `vhdl_dir`
         * `extra_env` is set in the local process environment
+        * `use_build_cache` (enabled by default) skips the GHDL analysis and link steps
+          when a hash of all build inputs (generated VHDL, extra VHDL files, top level
+          ports and ghdl version) matches the previous build, the VHDL code is
+          generated in every run. When disabled, the design is always rebuilt.
+        * `artifact_store` ArtifactStore or path of a store directory, linked simulations
+          are kept in the store and shared between processes building the same design
+        * `vhdl_libraries` list of VhdlLibrary objects, each library is analyzed once into
+          a separate directory (cached by the hash of its files) and made available to
+          the design via `-P`
+        * `write_build_report` when set, `build_report` is written to `.build-report.json`
+          in `build_dir`, the report includes the time required to load the simulation
+          library and to elaborate the design in the first call of `test`
+        * `build_profile` code generation options of the simulated design,
+          `"fast"` optimizes the generated code (`-O3`), `"fast-lto"` additionally
+          enables link time optimization and `"debug"` includes debug information (`-g`)
+        * `ghdl_backend` GHDL executable used to build the simulation (for example
+          `"ghdl-llvm"` or `"ghdl-gcc"`), by default ghdl-llvm is preferred because
+          of its shorter compile times. The `"fast-lto"` profile requires ghdl-gcc.
+        * `analysis_jobs` number of parallel GHDL processes used to analyze the
+          `vhdl_libraries`, libraries that do not depend on each other are analyzed
+          concurrently. The files of a single library (and of the design) are analyzed
+          sequentially, ordered by their entity/package/component dependencies.
+        * `build` result of `ghdl_sim.build_simulations`, when set the design is not
+          built again and the prebuilt simulation is used instead
+        * `max_sim_time`, `max_wall_time` (in seconds) and `max_idle_cycles` limit each
+          call of `test`. `max_idle_cycles` is counted separately
+          for each clock generated by `gen_clock`, the limit is exceeded when one
+          of these clocks completes more cycles, while no wait of the testbench
+          is over. When a limit is exceeded,
+          the simulation is finished and `test` raises an AssertionError, that lists
+          the pending coroutines. The wall time is only checked, when the simulator
+          calls into cohdl_sim (for example on clock edges or finished waits).
         """
@@ -0,0 +1,10 @@
+"""
+Simulator backend for the nvc VHDL simulator.
+
+nvc compiles the design just in time and is often considerably
+faster than GHDL for large designs. Like the default simulator,
+this backend runs testbenches in cocotb (using the VHPI interface of nvc),
+so the same testbenches can be used by changing the import of `Simulator`.
+"""
+
+from ._simulation import Simulator
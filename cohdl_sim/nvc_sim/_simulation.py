@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import os
+import warnings
+
+from pathlib import Path
+
+from cohdl import Entity
+
+from .._simulation import Simulator as _CocotbSimulator
+from .._vhdl_library import VhdlLibrary
+
+
+class Simulator(_CocotbSimulator):
+    def __init__(
+        self,
+        entity: type[Entity],
+        *,
+        build_dir: str = "build",
+        sim_args: list[str] | None = None,
+        sim_dir: str = "sim",
+        vhdl_dir: str = "vhdl",
+        cast_vectors=None,
+        extra_env: dict[str, str] | None = None,
+        extra_vhdl_files: list[str] = None,
+        use_build_cache: bool = True,
+        artifact_store=None,
+        vhdl_libraries: list[VhdlLibrary] | None = None,
+        write_build_report: bool = False,
+        build_args: list[str] | None = None,
+        cocotb_extra_args: dict | None = None,
+    ):
+        # the cocotb runner reanalyzes all sources in every run,
+        # a design compiled in the store would not be reused
+        assert (
+            artifact_store is None
+        ), "nvc_sim.Simulator does not support 'artifact_store'"
+
+        self._build_args = [] if build_args is None else build_args
+
+        super().__init__(
+            entity,
+            build_dir=build_dir,
+            simulator="nvc",
+            sim_args=sim_args,
+            sim_dir=sim_dir,
+            vhdl_dir=vhdl_dir,
+            cast_vectors=cast_vectors,
+            extra_env=extra_env,
+            extra_vhdl_files=extra_vhdl_files,
+            use_build_cache=use_build_cache,
+            vhdl_libraries=vhdl_libraries,
+            write_build_report=write_build_report,
+            cocotb_extra_args=cocotb_extra_args,
+        )
+
+    def _run_simulation(
+        self, sim_build: Path, library_sources: dict[str, list[str]], run_args
+    ):
+        # cocotb-test does not support nvc, use the runner API of cocotb instead
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            from cocotb.runner import get_runner, get_results
+
+        runner = get_runner("nvc")
+        toplevel = run_args["toplevel"]
+
+        # cocotb_extra_args are added to run_args by the base class,
+        # they are passed to the test function of the runner
+        extra_args = {
+            name: value
+            for name, value in run_args.items()
+            if name not in ("simulator", "sim_args", "toplevel", "module", "extra_env")
+        }
+
+        # each library is analyzed into a separate nvc library
+        # in the build directory, the design library is analyzed last
+        for lib, sources in library_sources.items():
+            runner.build(
+                hdl_library=lib,
+                vhdl_sources=sources,
+                build_args=self._build_args,
+                build_dir=sim_build,
+            )
+
+        results = runner.test(
+            test_module=run_args["module"],
+            hdl_toplevel=toplevel,
+            hdl_toplevel_library=toplevel,
+            test_args=run_args["sim_args"],
+            extra_env=run_args["extra_env"],
+            build_dir=sim_build,
+            **extra_args,
+        )
+
+        num_tests, num_failed = get_results(results)
+
+        assert (
+            num_failed == 0
+        ), f"{num_failed} of {num_tests} tests failed (see {os.path.abspath(results)})"
@@ -0,0 +1,40 @@
+from cohdl import Entity
+
+from .._simulation import Simulator as _CocotbSimulator
+from .._vhdl_library import VhdlLibrary
+
+class Simulator(_CocotbSimulator):
+    def __init__(
+        self,
+        entity: type[Entity],
+        *,
+        build_dir: str = "build",
+        sim_args: list[str] | None = None,
+        sim_dir: str = "sim",
+        vhdl_dir: str = "vhdl",
+        cast_vectors=None,
+        extra_env: dict[str, str] | None = None,
+        extra_vhdl_files: list[str] = None,
+        use_build_cache: bool = True,
+        artifact_store: None = None,
+        vhdl_libraries: list[VhdlLibrary] | None = None,
+        write_build_report: bool = False,
+        build_args: list[str] | None = None,
+        cocotb_extra_args: dict | None = None,
+    ):
+        """
+        Simulator using the nvc VHDL simulator.
+        Testbenches run in cocotb, the simulator provides the same
+        interface as the default cohdl_sim.Simulator.
+
+        Differences to the default simulator:
+
+        * `sim_args` are passed to `nvc -r`
+        * `build_args` additional arguments passed to each `nvc` analysis
+          command (for example `["--std=2008"]`)
+        * `cocotb_extra_args` additional keyword arguments passed to the `test`
+          method of cocotb's nvc runner (for example `waves`, `seed` or `testcase`)
+          instead of `cocotb_test.simulator.run`
+        * the argument `simulator` is not supported, `artifact_store` must be None
+          because the cocotb runner analyzes all sources in every run
+        """
@@ -6,6 +6,10 @@
 #include <link.h>
 
 #include <mutex>
+#include <string_view>
+#include <chrono>
+#include <sstream>
+#include <ctime>
 
 void (*vlog_startup_routines[])(void) = {
     ghdl_cohdl_interface::ghdlInterfaceStartup,
@@ -27,6 +31,7 @@ namespace ghdl_cohdl_interface
         decltype(vpi_free_object)* free_object;
         decltype(vpi_remove_cb)* remove_cb;
         decltype(vpi_control)* control;
+        decltype(vpi_get_time)* get_time;
     };
 
     namespace
@@ -151,6 +156,110 @@ namespace ghdl_cohdl_interface
         interface.runStartupFunctions();
     }
 
+    void SignalWatcher::notify(GhdlInterface& interface, const std::string& newValue)
+    {
+        // a rising edge is a transition to '1' from any other state,
+        // a falling edge is a transition from '1' to any other state
+        const bool wasHigh = _value == "1";
+        const bool isHigh = newValue == "1";
+        const bool rising = isHigh and not wasHigh;
+        const bool falling = wasHigh and not isHigh;
+
+        _value = newValue;
+
+        _dispatching.clear();
+
+        std::size_t kept = 0;
+        bool sampleRequired = false;
+
+        for (auto& waiter : _waiters)
+        {
+            const bool transition =
+                waiter.edge == SignalEdge::CHANGE
+                or (waiter.edge == SignalEdge::RISING and rising)
+                or (waiter.edge == SignalEdge::FALLING and falling);
+
+            if (transition and waiter.sampleAfter)
+            {
+                // evaluated later in sample()
+                waiter.checkPending = true;
+                sampleRequired = true;
+                _waiters[kept++] = std::move(waiter);
+                continue;
+            }
+
+            const bool matches = transition
+                and (waiter.condition == nullptr or interface._evaluate(*waiter.condition));
+
+            if (matches and --waiter.remaining == 0)
+                _dispatching.push_back(std::move(waiter));
+            else
+                _waiters[kept++] = std::move(waiter);
+        }
+
+        _waiters.resize(kept);
+
+        if (sampleRequired and not _samplePending)
+        {
+            interface._registerDelay(1, [](p_cb_data data) -> PLI_INT32 {
+                GhdlInterface::singleton()._onSignalSample(*(SignalWatcher*) data->user_data);
+                return 0;
+            }, this);
+
+            _samplePending = true;
+        }
+
+        dispatch(interface);
+    }
+
+    void SignalWatcher::sample(GhdlInterface& interface)
+    {
+        _samplePending = false;
+        _dispatching.clear();
+
+        std::size_t kept = 0;
+
+        for (auto& waiter : _waiters)
+        {
+            if (waiter.checkPending)
+            {
+                waiter.checkPending = false;
+
+                const bool matches = waiter.condition == nullptr or interface._evaluate(*waiter.condition);
+
+                if (matches and --waiter.remaining == 0)
+                {
+                    _dispatching.push_back(std::move(waiter));
+                    continue;
+                }
+            }
+
+            _waiters[kept++] = std::move(waiter);
+        }
+
+        _waiters.resize(kept);
+
+        dispatch(interface);
+    }
+
+    void SignalWatcher::dispatch(GhdlInterface& interface)
+    {
+        // resumed code may register new waiters (in _waiters)
+        // or cancel waiters of the current notification
+        for (std::size_t i = 0; i < _dispatching.size(); ++i)
+        {
+            const unsigned long slot = _dispatching[i].slot;
+
+            if (slot != NO_SLOT)
+            {
+                _dispatching[i].slot = NO_SLOT;
+                interface._resume(slot);
+            }
+        }
+
+        _dispatching.clear();
+    }
+
     void GhdlInterface::_clearHandle(VpiHandle& handle)
     {
         if (handle.interfaceId() == _interfaceId)
@@ -285,6 +394,7 @@ namespace ghdl_cohdl_interface
             }
 
             _currentCallback = nullptr;
+            GhdlInterface::singleton()._removeIdleWatchers(nullptr);
             return 0;
         };
 
@@ -315,7 +425,14 @@ namespace ghdl_cohdl_interface
 
     void GhdlInterface::runStartupFunctions()
     {
-        for (auto& fn : _startupFunctions)
+        // startup functions run once per simulation,
+        // they are released after running
+        auto startupFunctions = std::move(_startupFunctions);
+        _startupFunctions.clear();
+
+        _armWatchdog();
+
+        for (auto& fn : startupFunctions)
         {
             fn();
         }
@@ -345,6 +462,9 @@ namespace ghdl_cohdl_interface
         for (std::string& arg : _args)
             _argsPtr.push_back(arg.data());
 
+        auto wallStart = std::chrono::steady_clock::now();
+        std::clock_t cpuStart = std::clock();
+
         _dlHandle = ::dlopen(simulationSo.c_str(),  RTLD_NOW | RTLD_GLOBAL);
 
         if (_dlHandle == nullptr)
@@ -366,19 +486,51 @@ namespace ghdl_cohdl_interface
         load_symbol(_dlHandle, "vpi_free_object", _vpiFunctions->free_object);
         load_symbol(_dlHandle, "vpi_remove_cb", _vpiFunctions->remove_cb);
         load_symbol(_dlHandle, "vpi_control", _vpiFunctions->control);
+        load_symbol(_dlHandle, "vpi_get_time", _vpiFunctions->get_time);
+
+        _loadTime = {
+            std::chrono::duration<double>(std::chrono::steady_clock::now() - wallStart).count(),
+            double(std::clock() - cpuStart) / CLOCKS_PER_SEC
+        };
 
         _stopped = false;
+        _progress = 0;
+        _watchdogReason.clear();
+
+        // watchers and clocks of previous simulations refer to released VPI objects
+        _signalWatchers.clear();
+        _idleWatchers.clear();
+        _clocks.clear();
+        _cycleCallbacks.clear();
+        _timerGroups.clear();
+        _timerGroupOfDeadline.clear();
+        _freeTimerGroups.clear();
+        _timerGroupOfSlot.clear();
 
         _vpiFunctions->ghdl_main(_argsPtr.size(), _argsPtr.data());
         _stopped = true;
     }
 
+    std::pair<double, double> GhdlInterface::load_time() const
+    {
+        return _loadTime;
+    }
+
     void GhdlInterface::stop()
     {
         if (_dlHandle != nullptr)
         {
             finish_simulation();
             _interfaceId = -1;
+            _signalWatchers.clear();
+            _idleWatchers.clear();
+            _clocks.clear();
+            _cycleCallbacks.clear();
+            _timerGroups.clear();
+            _timerGroupOfDeadline.clear();
+            _freeTimerGroups.clear();
+            _timerGroupOfSlot.clear();
+            _resumeHandler = nullptr;
             ::dlclose(_dlHandle);
             _dlHandle = nullptr;
             _stopped = true;
@@ -481,7 +633,7 @@ namespace ghdl_cohdl_interface
         return _registerCallback(&data, std::move(callback), false);
     }
 
-    VpiCbHandle GhdlInterface::callback_delay(unsigned duration, std::function<void()> callback)
+    VpiCbHandle GhdlInterface::callback_delay(std::uint64_t duration, std::function<void()> callback)
     {
         s_cb_data data;
         s_vpi_time time;
@@ -490,8 +642,8 @@ namespace ghdl_cohdl_interface
         value.format = vpiBinStrVal;
 
         time.type = vpiSimTime;
-        time.high = 0;
-        time.low = duration;
+        time.high = PLI_UINT32(duration >> 32);
+        time.low = PLI_UINT32(duration);
         time.real = 0;
         
         data.reason = cbAfterDelay;
@@ -538,6 +690,667 @@ namespace ghdl_cohdl_interface
         return _registerCallback(&data, std::move(callback), true);
     }
 
+    void GhdlInterface::_onSignalChange(SignalWatcher& watcher)
+    {
+        _checkWallTime();
+
+        if (_stopped)
+            return;
+
+        try
+        {
+
+            ::s_vpi_value val;
+            val.format = vpiBinStrVal;
+            _vpiFunctions->get_value((vpiHandle) watcher._object, &val);
+
+            watcher.notify(*this, val.value.str);
+        }
+        catch(const std::exception& e)
+        {
+            std::cerr << e.what() << '\n';
+            finish_simulation();
+        }
+
+        if (watcher.idle())
+        {
+            _idleWatchers.push_back(watcher._object);
+        }
+
+        _removeIdleWatchers(&watcher);
+    }
+
+    void GhdlInterface::_onSignalSample(SignalWatcher& watcher)
+    {
+        _checkWallTime();
+
+        if (_stopped)
+            return;
+
+        try
+        {
+            watcher.sample(*this);
+        }
+        catch(const std::exception& e)
+        {
+            std::cerr << e.what() << '\n';
+            finish_simulation();
+        }
+
+        if (watcher.idle())
+        {
+            _idleWatchers.push_back(watcher._object);
+        }
+
+        _removeIdleWatchers(&watcher);
+    }
+
+    void GhdlInterface::_removeIdleWatchers(const SignalWatcher* current)
+    {
+        // A VPI callback is not removed while it is running.
+        // Idle watchers are removed after the next callback instead.
+        std::size_t kept = 0;
+
+        for (void* object : _idleWatchers)
+        {
+            auto it = _signalWatchers.find(object);
+
+            if (it == _signalWatchers.end() or not it->second->idle())
+                continue;
+
+            if (it->second.get() == current)
+            {
+                _idleWatchers[kept++] = object;
+                continue;
+            }
+
+            if (_vpiFunctions->remove_cb((vpiHandle) it->second->_cbHandle) == 0)
+            {
+                std::cerr << "WARN: remove callback failed\n";
+            }
+
+            _signalWatchers.erase(it);
+        }
+
+        _idleWatchers.resize(kept);
+    }
+
+    bool GhdlInterface::_evaluate(const Condition& condition) const
+    {
+        switch (condition.kind)
+        {
+            case Condition::Kind::EQUALS:
+            {
+                ::s_vpi_value val;
+                val.format = vpiBinStrVal;
+                _vpiFunctions->get_value((vpiHandle) condition.object, &val);
+
+                const std::string_view binStr{ val.value.str };
+
+                return binStr.size() >= condition.offset + condition.value.size()
+                    and binStr.compare(condition.offset, condition.value.size(), condition.value) == 0;
+            }
+            case Condition::Kind::ALL_OF:
+            {
+                for (const auto& operand : condition.operands)
+                    if (not _evaluate(operand))
+                        return false;
+
+                return true;
+            }
+            case Condition::Kind::ANY_OF:
+            {
+                for (const auto& operand : condition.operands)
+                    if (_evaluate(operand))
+                        return true;
+
+                return false;
+            }
+            case Condition::Kind::NOT:
+                return not _evaluate(condition.operands.at(0));
+        }
+
+        return false;
+    }
+
+    void GhdlInterface::set_resume_handler(std::function<void(unsigned long)> handler)
+    {
+        _resumeHandler = std::move(handler);
+    }
+
+    void GhdlInterface::_resume(unsigned long slot)
+    {
+        ++_progress;
+
+        if (_resumeHandler)
+            _resumeHandler(slot);
+    }
+
+    void GhdlInterface::add_signal_waiter(const VpiObjHandle& handle, unsigned long slot, SignalEdge edge, unsigned long count, std::shared_ptr<const Condition> condition, bool sampleAfter)
+    {
+        if (count == 0)
+        {
+            throw std::runtime_error{ "the number of transitions must be at least one" };
+        }
+
+        void* object = handle.get();
+        auto& watcher = _signalWatchers[object];
+
+        if (watcher == nullptr)
+        {
+            watcher = std::make_unique<SignalWatcher>(object, get_binstr(handle));
+
+            s_cb_data data;
+            s_vpi_time time{};
+            time.type = vpiSimTime;
+            s_vpi_value value{};
+            value.format = vpiBinStrVal;
+
+            data.reason = cbValueChange;
+            data.obj = (vpiHandle) object;
+            data.time = &time;
+            data.value = &value;
+            data.index = 0;
+            data.user_data = (PLI_BYTE8*) watcher.get();
+            data.cb_rtn = [](p_cb_data data) -> PLI_INT32 {
+                GhdlInterface::singleton()._onSignalChange(*(SignalWatcher*) data->user_data);
+                return 0;
+            };
+
+            watcher->_cbHandle = _vpiFunctions->register_cb(&data);
+
+            if (watcher->_cbHandle == nullptr)
+            {
+                _signalWatchers.erase(object);
+                throw std::runtime_error{ "registering callback failed" };
+            }
+        }
+
+        watcher->_waiters.push_back({ slot, edge, count, std::move(condition), sampleAfter });
+    }
+
+    void GhdlInterface::remove_signal_waiter(const VpiObjHandle& handle, unsigned long slot)
+    {
+        auto it = _signalWatchers.find(handle.get());
+
+        if (it == _signalWatchers.end())
+            return;
+
+        SignalWatcher& watcher = *it->second;
+
+        for (auto& waiter : watcher._dispatching)
+        {
+            if (waiter.slot == slot)
+            {
+                waiter.slot = NO_SLOT;
+                return;
+            }
+        }
+
+        for (auto waiter = watcher._waiters.begin(); waiter != watcher._waiters.end(); ++waiter)
+        {
+            if (waiter->slot == slot)
+            {
+                watcher._waiters.erase(waiter);
+
+                if (watcher.idle())
+                    _idleWatchers.push_back(watcher._object);
+
+                return;
+            }
+        }
+    }
+
+    void* GhdlInterface::_registerDelay(std::uint64_t delay, int (*cbRoutine)(t_cb_data*), void* userData)
+    {
+        s_cb_data data;
+        s_vpi_time time;
+
+        s_vpi_value value{};
+        value.format = vpiBinStrVal;
+
+        time.type = vpiSimTime;
+        time.high = PLI_UINT32(delay >> 32);
+        time.low = PLI_UINT32(delay);
+        time.real = 0;
+
+        data.reason = cbAfterDelay;
+        data.obj = nullptr;
+        data.time = &time;
+        data.value = &value;
+        data.index = 0;
+        data.user_data = (PLI_BYTE8*) userData;
+        data.cb_rtn = cbRoutine;
+
+        // GHDL releases the handle of a delay callback after it has fired
+        void* handle = _vpiFunctions->register_cb(&data);
+
+        if (handle == nullptr)
+            throw std::runtime_error{ "registering callback failed" };
+
+        return handle;
+    }
+
+    void GhdlInterface::_scheduleClockEdge(ClockGenerator& clock, std::uint64_t delay)
+    {
+        _registerDelay(delay, [](p_cb_data data) -> PLI_INT32 {
+            GhdlInterface::singleton()._onClockEdge(*(ClockGenerator*) data->user_data);
+            return 0;
+        }, &clock);
+    }
+
+    std::uint64_t GhdlInterface::sim_time() const
+    {
+        if (_dlHandle == nullptr)
+        {
+            throw std::runtime_error("the simulation time is only available while a simulation is running");
+        }
+
+        s_vpi_time time{};
+        time.type = vpiSimTime;
+
+        _vpiFunctions->get_time(nullptr, &time);
+
+        return (std::uint64_t(time.high) << 32) | time.low;
+    }
+
+    void GhdlInterface::_onTimerGroup(std::size_t index)
+    {
+        TimerGroup& group = _timerGroups[index];
+
+        if (not group.active)
+            return;
+
+        // the slots are swapped, both vectors keep their capacity
+        _releaseTimerGroup(index);
+        _dispatchingTimers.clear();
+        _dispatchingTimers.swap(group.slots);
+
+        for (unsigned long slot : _dispatchingTimers)
+            _timerGroupOfSlot[slot] = NO_GROUP;
+
+        try
+        {
+            _checkWallTime();
+
+            // resumed code may add new timers (in other groups)
+            // or cancel timers of the current group
+            for (std::size_t i = 0; i < _dispatchingTimers.size() and not _stopped; ++i)
+            {
+                const unsigned long slot = _dispatchingTimers[i];
+
+                if (slot != NO_SLOT)
+                {
+                    _dispatchingTimers[i] = NO_SLOT;
+                    _resume(slot);
+                }
+            }
+        }
+        catch(const std::exception& e)
+        {
+            std::cerr << e.what() << '\n';
+            finish_simulation();
+        }
+
+        _dispatchingTimers.clear();
+        _removeIdleWatchers(nullptr);
+    }
+
+    std::size_t GhdlInterface::_acquireTimerGroup(std::uint64_t deadline, std::uint64_t delay)
+    {
+        // waits in lockstep usually share the deadline of the last timer
+        if (_lastTimerGroup < _timerGroups.size())
+        {
+            const TimerGroup& last = _timerGroups[_lastTimerGroup];
+
+            if (last.active and last.deadline == deadline)
+                return _lastTimerGroup;
+        }
+
+        if (auto existing = _timerGroupOfDeadline.find(deadline); existing != _timerGroupOfDeadline.end())
+            return _lastTimerGroup = existing->second;
+
+        std::size_t index;
+
+        if (_freeTimerGroups.empty())
+        {
+            index = _timerGroups.size();
+            _timerGroups.emplace_back();
+        }
+        else
+        {
+            index = _freeTimerGroups.back();
+            _freeTimerGroups.pop_back();
+        }
+
+        TimerGroup& group = _timerGroups[index];
+
+        group.cbHandle = _registerDelay(delay, [](p_cb_data data) -> PLI_INT32 {
+            GhdlInterface::singleton()._onTimerGroup((std::size_t) (std::uintptr_t) data->user_data);
+            return 0;
+        }, (void*) (std::uintptr_t) index);
+
+        group.active = true;
+        group.deadline = deadline;
+        group.slots.clear();
+
+        _timerGroupOfDeadline.emplace(deadline, index);
+
+        return _lastTimerGroup = index;
+    }
+
+    void GhdlInterface::_releaseTimerGroup(std::size_t index)
+    {
+        TimerGroup& group = _timerGroups[index];
+
+        group.active = false;
+        _timerGroupOfDeadline.erase(group.deadline);
+        _freeTimerGroups.push_back(index);
+    }
+
+    void GhdlInterface::add_timer(std::uint64_t delay, unsigned long slot)
+    {
+        const std::size_t index = _acquireTimerGroup(sim_time() + delay, delay);
+
+        _timerGroups[index].slots.push_back(slot);
+
+        if (slot >= _timerGroupOfSlot.size())
+            _timerGroupOfSlot.resize(slot + 1, NO_GROUP);
+
+        _timerGroupOfSlot[slot] = index;
+    }
+
+    void GhdlInterface::remove_timer(unsigned long slot)
+    {
+        for (auto& pending : _dispatchingTimers)
+        {
+            if (pending == slot)
+            {
+                pending = NO_SLOT;
+                return;
+            }
+        }
+
+        if (slot >= _timerGroupOfSlot.size() or _timerGroupOfSlot[slot] == NO_GROUP)
+            return;
+
+        const std::size_t index = _timerGroupOfSlot[slot];
+        TimerGroup& group = _timerGroups[index];
+        _timerGroupOfSlot[slot] = NO_GROUP;
+
+        for (auto pending = group.slots.begin(); pending != group.slots.end(); ++pending)
+        {
+            if (*pending == slot)
+            {
+                group.slots.erase(pending);
+                break;
+            }
+        }
+
+        // the VPI callback is only removed, when no other timer uses it
+        if (group.slots.empty())
+        {
+            if (_vpiFunctions->remove_cb((vpiHandle) group.cbHandle) == 0)
+            {
+                std::cerr << "WARN: remove callback failed\n";
+            }
+
+            _releaseTimerGroup(index);
+        }
+    }
+
+    void GhdlInterface::_onClockEdge(ClockGenerator& clock)
+    {
+        _checkWallTime();
+
+        if (_stopped or not clock.running)
+            return;
+
+        try
+        {
+            clock.high = not clock.high;
+
+            // idle cycles are counted separately for each clock,
+            // so the limit does not depend on the number of clocks
+            if (clock.high and _watchdog.maxIdleCycles != 0)
+            {
+                if (clock.progressSeen != _progress)
+                {
+                    clock.progressSeen = _progress;
+                    clock.idleCycles = 0;
+                }
+
+                if (++clock.idleCycles > _watchdog.maxIdleCycles)
+                {
+                    _tripWatchdog("no testbench progress for " + std::to_string(_watchdog.maxIdleCycles) + " clock cycles");
+                    return;
+                }
+            }
+
+            s_vpi_value val;
+            val.format = vpiBinStrVal;
+            PLI_BYTE8 binStr[] = { clock.high ? '1' : '0', 0 };
+            val.value.str = binStr;
+
+            _vpiFunctions->put_value((vpiHandle) clock.object, &val, nullptr, vpiNoDelay | vpiPureTransportDelay);
+
+            _scheduleClockEdge(clock, clock.high ? clock.highTime : clock.lowTime);
+        }
+        catch(const std::exception& e)
+        {
+            std::cerr << e.what() << '\n';
+            finish_simulation();
+        }
+
+        _removeIdleWatchers(nullptr);
+    }
+
+    unsigned long GhdlInterface::start_clock(VpiObjHandle& handle, std::uint64_t highTime, std::uint64_t lowTime, bool startHigh, std::uint64_t phase)
+    {
+        if (highTime == 0 or lowTime == 0)
+        {
+            throw std::runtime_error{ "the clock period is too short" };
+        }
+
+        auto& clock = _clocks.emplace_back(
+            std::make_unique<ClockGenerator>(ClockGenerator{ handle.get(), highTime, lowTime, startHigh })
+        );
+
+        put_value(handle, startHigh ? BitState::HIGH : BitState::LOW);
+        _scheduleClockEdge(*clock, phase + (startHigh ? highTime : lowTime));
+
+        return _clocks.size() - 1;
+    }
+
+    void GhdlInterface::stop_clock(unsigned long id)
+    {
+        // the pending delay callback still fires but does not toggle the signal
+        if (id < _clocks.size())
+            _clocks[id]->running = false;
+    }
+
+    unsigned long GhdlInterface::add_cycle_callback(const VpiObjHandle& clock, bool rising, const std::vector<const VpiObjHandle*>& sampled, const std::vector<const VpiObjHandle*>& driven, CycleFunction fn)
+    {
+        auto& cycle = _cycleCallbacks.emplace_back(std::make_unique<CycleCallback>());
+
+        cycle->clock = clock.get();
+        cycle->rising = rising;
+        cycle->fn = std::move(fn);
+        cycle->high = get_binstr(clock) == "1";
+
+        for (const VpiObjHandle* handle : sampled)
+            cycle->sampledPorts.push_back(handle->get());
+
+        for (const VpiObjHandle* handle : driven)
+            cycle->drivenPorts.push_back(handle->get());
+
+        s_cb_data data;
+        s_vpi_time time{};
+        time.type = vpiSimTime;
+        s_vpi_value value{};
+        value.format = vpiBinStrVal;
+
+        data.reason = cbValueChange;
+        data.obj = (vpiHandle) cycle->clock;
+        data.time = &time;
+        data.value = &value;
+        data.index = 0;
+        data.user_data = (PLI_BYTE8*) cycle.get();
+        data.cb_rtn = [](p_cb_data data) -> PLI_INT32 {
+            GhdlInterface::singleton()._onCycleEdge(*(CycleCallback*) data->user_data);
+            return 0;
+        };
+
+        cycle->cbHandle = _vpiFunctions->register_cb(&data);
+
+        if (cycle->cbHandle == nullptr)
+        {
+            _cycleCallbacks.pop_back();
+            throw std::runtime_error{ "registering callback failed" };
+        }
+
+        return _cycleCallbacks.size() - 1;
+    }
+
+    void GhdlInterface::remove_cycle_callback(unsigned long id)
+    {
+        // a pending delay callback of the cycle still fires but does nothing
+        if (id < _cycleCallbacks.size() and _cycleCallbacks[id]->running)
+        {
+            CycleCallback& cycle = *_cycleCallbacks[id];
+            cycle.running = false;
+
+            if (_vpiFunctions->remove_cb((vpiHandle) cycle.cbHandle) == 0)
+            {
+                std::cerr << "WARN: remove callback failed\n";
+            }
+        }
+    }
+
+    void GhdlInterface::_onCycleEdge(CycleCallback& cycle)
+    {
+        _checkWallTime();
+
+        if (_stopped or not cycle.running)
+            return;
+
+        ::s_vpi_value val;
+        val.format = vpiBinStrVal;
+        _vpiFunctions->get_value((vpiHandle) cycle.clock, &val);
+
+        const bool high = val.value.str[0] == '1' and val.value.str[1] == 0;
+        const bool active = cycle.rising ? (high and not cycle.high) : (cycle.high and not high);
+        cycle.high = high;
+
+        // ports are sampled after the edge, once the design has updated its outputs
+        if (active)
+        {
+            _registerDelay(1, [](p_cb_data data) -> PLI_INT32 {
+                GhdlInterface::singleton()._onCycle(*(CycleCallback*) data->user_data);
+                return 0;
+            }, &cycle);
+        }
+    }
+
+    void GhdlInterface::_onCycle(CycleCallback& cycle)
+    {
+        if (_stopped or not cycle.running)
+            return;
+
+        try
+        {
+            cycle.sampled.resize(cycle.sampledPorts.size());
+
+            for (std::size_t i = 0; i < cycle.sampledPorts.size(); ++i)
+            {
+                ::s_vpi_value val;
+                val.format = vpiBinStrVal;
+                _vpiFunctions->get_value((vpiHandle) cycle.sampledPorts[i], &val);
+
+                cycle.sampled[i].assign(val.value.str);
+            }
+
+            // the cycle function counts as testbench progress
+            ++_progress;
+            cycle.drive.clear();
+            cycle.fn(cycle.sampled, cycle.drive);
+
+            if (cycle.drive.size() > cycle.drivenPorts.size())
+            {
+                throw std::runtime_error{ "the cycle function returned more values than driven ports" };
+            }
+
+            for (std::size_t i = 0; i < cycle.drive.size(); ++i)
+            {
+                if (cycle.drive[i].empty())
+                    continue;
+
+                s_vpi_value val;
+                val.format = vpiBinStrVal;
+                val.value.str = cycle.drive[i].data();
+
+                _vpiFunctions->put_value((vpiHandle) cycle.drivenPorts[i], &val, nullptr, vpiNoDelay | vpiPureTransportDelay);
+            }
+        }
+        catch(const std::exception& e)
+        {
+            std::cerr << e.what() << '\n';
+            finish_simulation();
+        }
+
+        _removeIdleWatchers(nullptr);
+    }
+
+    void GhdlInterface::set_watchdog(WatchdogLimits limits)
+    {
+        _watchdog = limits;
+    }
+
+    const std::string& GhdlInterface::watchdog_reason() const
+    {
+        return _watchdogReason;
+    }
+
+    void GhdlInterface::_armWatchdog()
+    {
+        // called once at the start of each simulation
+        _wallDeadline = std::chrono::steady_clock::now() + std::chrono::duration_cast<std::chrono::steady_clock::duration>(
+            std::chrono::duration<double>(_watchdog.maxWallTime)
+        );
+
+        if (_watchdog.maxSimTime != 0)
+        {
+            _registerDelay(_watchdog.maxSimTime, [](p_cb_data) -> PLI_INT32 {
+                auto& interface = GhdlInterface::singleton();
+
+                if (not _stopped)
+                    interface._tripWatchdog("simulation time limit of " + std::to_string(interface._watchdog.maxSimTime) + " ps exceeded");
+
+                return 0;
+            }, nullptr);
+        }
+    }
+
+    void GhdlInterface::_checkWallTime()
+    {
+        // The wall time is checked in all callbacks of the interface.
+        // Designs, that run without any callbacks, are not interrupted.
+        if (_watchdog.maxWallTime != 0.0 and not _stopped and std::chrono::steady_clock::now() > _wallDeadline)
+        {
+            std::ostringstream reason;
+            reason << "wall time limit of " << _watchdog.maxWallTime << " s exceeded";
+            _tripWatchdog(reason.str());
+        }
+    }
+
+    void GhdlInterface::_tripWatchdog(std::string reason)
+    {
+        if (_watchdogReason.empty())
+            _watchdogReason = std::move(reason);
+
+        finish_simulation();
+    }
+
     void GhdlInterface::finish_simulation()
     {
         _vpiFunctions->control(vpiFinish, 2);
@@ -2,11 +2,20 @@
 
 #include <array>
 #include <vector>
+#include <string>
 #include <iostream>
 
 #include <functional>
 #include <filesystem>
 #include <optional>
+#include <utility>
+#include <memory>
+#include <unordered_map>
+#include <cstdint>
+#include <chrono>
+
+// defined in vpi_user.h
+struct t_cb_data;
 
 namespace ghdl_cohdl_interface
 {
@@ -155,10 +164,173 @@ namespace ghdl_cohdl_interface
         ~VpiCbHandle();
     };
     
+    // transitions a signal waiter is interested in,
+    // edges are only detected for single bit signals
+    enum class SignalEdge
+    {
+        CHANGE,
+        RISING,
+        FALLING
+    };
+
+    // declarative condition on signal values, evaluated in VPI callbacks
+    struct Condition
+    {
+        enum class Kind
+        {
+            EQUALS,
+            ALL_OF,
+            ANY_OF,
+            NOT
+        };
+
+        Kind kind;
+
+        // EQUALS: the binary string of `object` contains
+        // `value` starting at the character `offset`
+        void* object = nullptr;
+        std::size_t offset = 0;
+        std::string value;
+
+        // ALL_OF, ANY_OF, NOT
+        std::vector<Condition> operands;
+    };
+
+    // Waits are identified by resume slots. A slot is a small integer
+    // chosen by the caller, that is passed to the resume handler of
+    // GhdlInterface when the wait is over. Each slot is used by
+    // at most one pending wait at a time.
+    inline constexpr unsigned long NO_SLOT = ~0ul;
+
+    struct SignalWaiter
+    {
+        unsigned long slot;
+        SignalEdge edge;
+        // number of matching transitions until the waiter is resumed
+        unsigned long remaining;
+        // optional, transitions only match while the condition holds
+        std::shared_ptr<const Condition> condition;
+        // the condition is evaluated one simulation time step after the
+        // transition (once the design has reacted to it) instead of immediately
+        bool sampleAfter = false;
+        // a transition was detected, the delayed evaluation is pending
+        bool checkPending = false;
+    };
+
+    // Owns a single VPI value change callback of one signal and
+    // forwards each change to all waiters registered at that time.
+    // Waiters are one-shot, they are removed before they are resumed.
+    class SignalWatcher
+    {
+        friend GhdlInterface;
+
+        void* _object;
+        void* _cbHandle = nullptr;
+
+        // value of the signal after the last change
+        std::string _value;
+
+        std::vector<SignalWaiter> _waiters;
+
+        // waiters of the current notification, the slot of
+        // cancelled waiters is reset to NO_SLOT so they are skipped
+        std::vector<SignalWaiter> _dispatching;
+
+        // a delay callback evaluates the conditions of waiters with sampleAfter,
+        // the watcher is not removed while it is pending
+        bool _samplePending = false;
+
+        void notify(GhdlInterface& interface, const std::string& newValue);
+
+        void sample(GhdlInterface& interface);
+
+        void dispatch(GhdlInterface& interface);
+
+    public:
+
+        SignalWatcher(void* object, std::string value)
+            : _object{ object }
+            , _value{ std::move(value) }
+        {}
+
+        bool idle() const noexcept
+        {
+            return _waiters.empty() and not _samplePending;
+        }
+    };
+
+    // All timers expiring at the same simulation time share a single
+    // VPI callback, they are resumed in the order they were added.
+    // Groups are looked up by their deadline and reused, once the pool
+    // has grown to the number of distinct pending deadlines,
+    // timers do not allocate memory.
+    struct TimerGroup
+    {
+        bool active = false;
+        std::uint64_t deadline = 0;
+        void* cbHandle = nullptr;
+        std::vector<unsigned long> slots;
+    };
+
+    inline constexpr std::size_t NO_GROUP = ~std::size_t(0);
+
+    // Drives a single bit signal with a periodic clock.
+    // Every half period is handled by a VPI delay callback in C++,
+    // Python is not involved once the clock is started.
+    struct ClockGenerator
+    {
+        void* object;
+        // duration of the high and low phase in simulation time steps
+        std::uint64_t highTime;
+        std::uint64_t lowTime;
+        bool high;
+        bool running = true;
+        // rising edges since the testbench last made progress,
+        // valid while `progressSeen` equals GhdlInterface::_progress
+        std::uint64_t idleCycles = 0;
+        std::uint64_t progressSeen = 0;
+    };
+
+    // Called once per clock cycle with the values of the sampled ports
+    // (as binary strings), fills `drive` with the new values of the
+    // driven ports, empty strings leave a port unchanged.
+    using CycleFunction = std::function<void(const std::vector<std::string>& sampled, std::vector<std::string>& drive)>;
+
+    // Calls a function one simulation time step after each active edge
+    // of a clock. All ports are sampled and driven in C++, the function
+    // is the only call into Python per cycle.
+    struct CycleCallback
+    {
+        void* clock;
+        bool rising;
+        std::vector<void*> sampledPorts;
+        std::vector<void*> drivenPorts;
+        CycleFunction fn;
+        void* cbHandle = nullptr;
+        bool high = false;
+        bool running = true;
+        // reused in every cycle
+        std::vector<std::string> sampled;
+        std::vector<std::string> drive;
+    };
+
+    // Limits of a single simulation run, a value of zero disables the limit.
+    struct WatchdogLimits
+    {
+        // in simulation time steps
+        std::uint64_t maxSimTime = 0;
+        // in seconds
+        double maxWallTime = 0.0;
+        // number of clock cycles produced by start_clock
+        // without resuming any wait
+        std::uint64_t maxIdleCycles = 0;
+    };
+
     class GhdlInterface
     {
         friend VpiHandle;
         friend VpiCbHandle;
+        friend SignalWatcher;
         
         static unsigned _interfaceIdCount;
         static void* _currentCallback;
@@ -179,10 +351,85 @@ namespace ghdl_cohdl_interface
 
         void* _dlHandle = nullptr;
 
+        // wall and cpu time in seconds, required to load the simulation library
+        std::pair<double, double> _loadTime{ 0.0, 0.0 };
+
         std::filesystem::path _selfLibPath;
 
         std::unique_ptr<VpiFunctions> _vpiFunctions;
 
+        // one watcher per signal with active waiters, watchers without waiters
+        // are listed in _idleWatchers and removed in the next callback
+        std::unordered_map<void*, std::unique_ptr<SignalWatcher>> _signalWatchers;
+        std::vector<void*> _idleWatchers;
+
+        // clocks started in the current simulation, the id
+        // returned by start_clock is the index in this list
+        std::vector<std::unique_ptr<ClockGenerator>> _clocks;
+
+        // cycle callbacks of the current simulation, the id returned
+        // by add_cycle_callback is the index in this list
+        std::vector<std::unique_ptr<CycleCallback>> _cycleCallbacks;
+
+        // called with the resume slot of each finished wait
+        std::function<void(unsigned long)> _resumeHandler;
+
+        // pool of timer groups, the index of a group
+        // is passed to its VPI callback
+        std::vector<TimerGroup> _timerGroups;
+        std::size_t _lastTimerGroup = 0;
+
+        // index of the active group of each pending deadline
+        // and indices of inactive groups, that can be reused
+        std::unordered_map<std::uint64_t, std::size_t> _timerGroupOfDeadline;
+        std::vector<std::size_t> _freeTimerGroups;
+
+        // group of each pending timer, indexed by its resume slot
+        std::vector<std::size_t> _timerGroupOfSlot;
+
+        // slots of the group, that is currently running,
+        // cancelled timers are reset to NO_SLOT
+        std::vector<unsigned long> _dispatchingTimers;
+
+        WatchdogLimits _watchdog;
+        std::chrono::steady_clock::time_point _wallDeadline;
+        // incremented whenever the testbench makes progress,
+        // resets the idle counters of all clocks at once
+        std::uint64_t _progress = 0;
+        // empty until the watchdog has ended the simulation
+        std::string _watchdogReason;
+
+        void _armWatchdog();
+
+        void _tripWatchdog(std::string reason);
+
+        void _checkWallTime();
+
+        void _resume(unsigned long slot);
+
+        std::size_t _acquireTimerGroup(std::uint64_t deadline, std::uint64_t delay);
+        void _releaseTimerGroup(std::size_t index);
+
+        void _onSignalChange(SignalWatcher& watcher);
+
+        void _onSignalSample(SignalWatcher& watcher);
+
+        void* _registerDelay(std::uint64_t delay, int (*cbRoutine)(t_cb_data*), void* userData);
+
+        void _onTimerGroup(std::size_t index);
+
+        void _scheduleClockEdge(ClockGenerator& clock, std::uint64_t delay);
+
+        void _onClockEdge(ClockGenerator& clock);
+
+        void _onCycleEdge(CycleCallback& cycle);
+
+        void _onCycle(CycleCallback& cycle);
+
+        void _removeIdleWatchers(const SignalWatcher* current);
+
+        bool _evaluate(const Condition& condition) const;
+
         GhdlInterface(std::filesystem::path selfLibPath);
 
         static std::string _findLibPath();
@@ -209,12 +456,17 @@ namespace ghdl_cohdl_interface
 
         void stop();
 
+        std::pair<double, double> load_time() const;
+
         //
         // simulation functions
         //
 
         VpiObjHandle handle_by_name(std::string name);
 
+        // current simulation time in simulation time steps
+        std::uint64_t sim_time() const;
+
         void put_value(VpiObjHandle& handle, BitState state);
 
         void put_value(VpiObjHandle& handle, const std::string& binStr);
@@ -227,7 +479,7 @@ namespace ghdl_cohdl_interface
 
         VpiCbHandle callback_end_of_simulation(std::function<void()>);
 
-        VpiCbHandle callback_delay(unsigned duration, std::function<void()>);
+        VpiCbHandle callback_delay(std::uint64_t duration, std::function<void()>);
 
         VpiCbHandle callback_next_sim_time(std::function<void()>);
         // VpiCbHandle callback_read_only_sync(unsigned duration, void(*)(void*));
@@ -235,6 +487,48 @@ namespace ghdl_cohdl_interface
 
         VpiCbHandle callback_value_change(const VpiObjHandle& handle, std::function<void()>);
 
+        // `handler` is called with the resume slot of each finished
+        // wait (signal waiters and timers)
+        void set_resume_handler(std::function<void(unsigned long)> handler);
+
+        // resume `slot` once on the next value change of `handle`
+        // (or the next rising/falling edge), all waiters of a signal
+        // share one VPI callback, when `count` is larger than one
+        // the slot is resumed on the count-th matching transition,
+        // when a condition is given only transitions count, at which
+        // the condition holds
+        void add_signal_waiter(const VpiObjHandle& handle, unsigned long slot, SignalEdge edge = SignalEdge::CHANGE, unsigned long count = 1, std::shared_ptr<const Condition> condition = nullptr, bool sampleAfter = false);
+
+        void remove_signal_waiter(const VpiObjHandle& handle, unsigned long slot);
+
+        // drive `handle` with a clock, that starts in the state `startHigh`
+        // and toggles after `phase` plus the duration of the first state,
+        // durations are given in simulation time steps
+        unsigned long start_clock(VpiObjHandle& handle, std::uint64_t highTime, std::uint64_t lowTime, bool startHigh, std::uint64_t phase = 0);
+
+        void stop_clock(unsigned long id);
+
+        // call `fn` one time step after each rising (or falling) edge of
+        // `clock` with the values of `sampled`, the values returned
+        // in `drive` are written to the ports in `driven`
+        unsigned long add_cycle_callback(const VpiObjHandle& clock, bool rising, const std::vector<const VpiObjHandle*>& sampled, const std::vector<const VpiObjHandle*>& driven, CycleFunction fn);
+
+        void remove_cycle_callback(unsigned long id);
+
+        // resume `slot` once after `delay` simulation time steps
+        void add_timer(std::uint64_t delay, unsigned long slot);
+
+        // cancel a timer that has not fired yet
+        void remove_timer(unsigned long slot);
+
+        // limits of the following simulation runs, when a limit is
+        // exceeded the simulation is finished and watchdog_reason()
+        // describes the exceeded limit
+        void set_watchdog(WatchdogLimits limits);
+
+        // empty, when the last simulation was not ended by the watchdog
+        const std::string& watchdog_reason() const;
+
         void finish_simulation();
     
         ~GhdlInterface();
@@ -9,6 +9,8 @@ using ghdl_cohdl_interface::GhdlInterface;
 using ghdl_cohdl_interface::VpiObjHandle;
 using ghdl_cohdl_interface::VpiCbHandle;
 using ghdl_cohdl_interface::BitState;
+using ghdl_cohdl_interface::SignalEdge;
+using ghdl_cohdl_interface::Condition;
 
 class ObjectHandle
 {
@@ -60,12 +62,17 @@ public:
         _interface.stop();
     }
 
+    std::pair<double, double> loadTime() const
+    {
+        return _interface.load_time();
+    }
+
     void addStartupFunction(std::function<void()> fn)
     {
         _interface.addStartupFunction(std::move(fn));
     }
 
-    VpiCbHandle callbackDelay(std::function<void()> fn, unsigned delay)
+    VpiCbHandle callbackDelay(std::function<void()> fn, std::uint64_t delay)
     {
         return _interface.callback_delay(delay, std::move(fn));
     }
@@ -75,6 +82,41 @@ public:
         return _interface.callback_value_change(handle.handle(), std::move(fn));
     }
 
+    void setResumeHandler(std::function<void(unsigned long)> fn)
+    {
+        _interface.set_resume_handler(std::move(fn));
+    }
+
+    void addSignalWaiter(ObjectHandle& handle, unsigned long slot, SignalEdge edge, unsigned long count, std::shared_ptr<Condition> condition, bool sampleAfter)
+    {
+        _interface.add_signal_waiter(handle.handle(), slot, edge, count, std::move(condition), sampleAfter);
+    }
+
+    void removeSignalWaiter(ObjectHandle& handle, unsigned long slot)
+    {
+        _interface.remove_signal_waiter(handle.handle(), slot);
+    }
+
+    void addTimer(std::uint64_t delay, unsigned long slot)
+    {
+        _interface.add_timer(delay, slot);
+    }
+
+    void removeTimer(unsigned long slot)
+    {
+        _interface.remove_timer(slot);
+    }
+
+    unsigned long startClock(ObjectHandle& handle, std::uint64_t highTime, std::uint64_t lowTime, bool startHigh, std::uint64_t phase)
+    {
+        return _interface.start_clock(handle.handle(), highTime, lowTime, startHigh, phase);
+    }
+
+    void stopClock(unsigned long id)
+    {
+        _interface.stop_clock(id);
+    }
+
     VpiCbHandle callbackNextSimTime(std::function<void()> fn)
     {
         return _interface.callback_next_sim_time(std::move(fn));
@@ -91,6 +133,49 @@ public:
         _interface.finish_simulation();
     }
 
+    std::uint64_t simTime() const
+    {
+        return _interface.sim_time();
+    }
+
+    unsigned long addCycleCallback(ObjectHandle& clock, bool rising, const std::vector<ObjectHandle*>& sampled, const std::vector<ObjectHandle*>& driven, std::function<std::optional<std::vector<std::string>>(const std::vector<std::string>&)> fn)
+    {
+        std::vector<const VpiObjHandle*> sampledHandles;
+        std::vector<const VpiObjHandle*> drivenHandles;
+
+        for (ObjectHandle* handle : sampled)
+            sampledHandles.push_back(&handle->handle());
+
+        for (ObjectHandle* handle : driven)
+            drivenHandles.push_back(&handle->handle());
+
+        // `fn` takes a list of binary strings and returns
+        // a list of binary strings or None
+        auto cycleFn = [fn = std::move(fn)](const std::vector<std::string>& values, std::vector<std::string>& drive) {
+            auto result = fn(values);
+
+            if (result.has_value())
+                drive = std::move(*result);
+        };
+
+        return _interface.add_cycle_callback(clock.handle(), rising, sampledHandles, drivenHandles, std::move(cycleFn));
+    }
+
+    void removeCycleCallback(unsigned long id)
+    {
+        _interface.remove_cycle_callback(id);
+    }
+
+    void setWatchdog(std::uint64_t maxSimTime, double maxWallTime, std::uint64_t maxIdleCycles)
+    {
+        _interface.set_watchdog({ maxSimTime, maxWallTime, maxIdleCycles });
+    }
+
+    std::string watchdogReason() const
+    {
+        return _interface.watchdog_reason();
+    }
+
     ObjectHandle handleByName(std::string name)
     {
         return _interface.handle_by_name(name);
@@ -102,6 +187,27 @@ public:
     }
 };
 
+std::shared_ptr<Condition> conditionEquals(ObjectHandle& handle, std::size_t offset, std::string value)
+{
+    auto condition = std::make_shared<Condition>();
+    condition->kind = Condition::Kind::EQUALS;
+    condition->object = handle.handle().get();
+    condition->offset = offset;
+    condition->value = std::move(value);
+    return condition;
+}
+
+std::shared_ptr<Condition> conditionCombine(Condition::Kind kind, const std::vector<std::shared_ptr<Condition>>& operands)
+{
+    auto condition = std::make_shared<Condition>();
+    condition->kind = kind;
+
+    for (const auto& operand : operands)
+        condition->operands.push_back(*operand);
+
+    return condition;
+}
+
 void enterCallbackHandle(VpiCbHandle& callback)
 {}
 
@@ -114,6 +220,23 @@ void exitCallbackHandle(VpiCbHandle& callback, py::object&, py::object&, py::obj
 PYBIND11_MODULE(cohdl_sim_ghdl_interface, m) {
     m.doc() = "pybind11 example plugin"; // optional module docstring
 
+    pybind11::enum_<SignalEdge>(m, "SignalEdge")
+        .value("CHANGE", SignalEdge::CHANGE)
+        .value("RISING", SignalEdge::RISING)
+        .value("FALLING", SignalEdge::FALLING);
+
+    pybind11::class_<Condition, std::shared_ptr<Condition>>(m, "Condition")
+        .def_static("equals", conditionEquals)
+        .def_static("all_of", [](const std::vector<std::shared_ptr<Condition>>& operands) {
+            return conditionCombine(Condition::Kind::ALL_OF, operands);
+        })
+        .def_static("any_of", [](const std::vector<std::shared_ptr<Condition>>& operands) {
+            return conditionCombine(Condition::Kind::ANY_OF, operands);
+        })
+        .def_static("negate", [](const std::shared_ptr<Condition>& operand) {
+            return conditionCombine(Condition::Kind::NOT, { operand });
+        });
+
     pybind11::class_<VpiCbHandle>(m, "VpiCbHandle")
         .def("release", &VpiCbHandle::release)
         .def("__enter__", enterCallbackHandle)
@@ -127,12 +250,29 @@ PYBIND11_MODULE(cohdl_sim_ghdl_interface, m) {
     pybind11::class_<InterfaceWrapper>(m, "GhdlInterface")
         .def(pybind11::init<>())
         .def("handle_by_name", &InterfaceWrapper::handleByName)
+        .def("sim_time", &InterfaceWrapper::simTime)
         .def("add_startup_function", &InterfaceWrapper::addStartupFunction)
         .def("add_callback_delay", &InterfaceWrapper::callbackDelay)
         .def("add_callback_value_change", &InterfaceWrapper::callbackValueChange)
+        .def("add_signal_waiter", &InterfaceWrapper::addSignalWaiter,
+            py::arg("handle"), py::arg("slot"), py::arg("edge") = SignalEdge::CHANGE, py::arg("count") = 1, py::arg("condition") = py::none(), py::arg("sample_after") = false)
+        .def("remove_signal_waiter", &InterfaceWrapper::removeSignalWaiter)
+        .def("set_resume_handler", &InterfaceWrapper::setResumeHandler)
+        .def("add_timer", &InterfaceWrapper::addTimer)
+        .def("remove_timer", &InterfaceWrapper::removeTimer)
+        .def("start_clock", &InterfaceWrapper::startClock,
+            py::arg("handle"), py::arg("high_time"), py::arg("low_time"), py::arg("start_high") = false, py::arg("phase") = 0)
+        .def("stop_clock", &InterfaceWrapper::stopClock)
+        .def("add_cycle_callback", &InterfaceWrapper::addCycleCallback,
+            py::arg("clock"), py::arg("rising"), py::arg("sampled"), py::arg("driven"), py::arg("fn"))
+        .def("remove_cycle_callback", &InterfaceWrapper::removeCycleCallback)
+        .def("set_watchdog", &InterfaceWrapper::setWatchdog,
+            py::arg("max_sim_time") = 0, py::arg("max_wall_time") = 0.0, py::arg("max_idle_cycles") = 0)
+        .def("watchdog_reason", &InterfaceWrapper::watchdogReason)
         .def("add_callback_next_sim_time", &InterfaceWrapper::callbackNextSimTime)
         .def("start", &InterfaceWrapper::start)
         .def("stop", &InterfaceWrapper::stop)
+        .def("load_time", &InterfaceWrapper::loadTime)
         .def("cleanup", &InterfaceWrapper::cleanup)
         .def("finish_simulation", &InterfaceWrapper::finishSimulation);
 }
@@ -0,0 +1,33 @@
+import pytest
+
+from cohdl import Signal, Signed, Unsigned
+
+from cohdl_sim._base_proxy_port import _BaseProxyPort
+
+
+class FakePort(_BaseProxyPort):
+    # top level port, that stores its value as binary string
+    # instead of reading and writing a simulator signal
+
+    def __init__(self, entity_port, root=None):
+        super().__init__(entity_port, root)
+        self.binstr = None
+
+    def _load(self):
+        self._Wrapped._assign(self.binstr)
+
+    def _store(self):
+        if isinstance(self._Wrapped, (Unsigned, Signed)):
+            self.binstr = str(self._Wrapped.bitvector)
+        else:
+            self.binstr = str(self._Wrapped)
+
+
+@pytest.fixture
+def make_port():
+    def make(port_type, binstr: str):
+        port = FakePort(Signal[port_type]())
+        port.binstr = binstr
+        return port
+
+    return make
@@ -0,0 +1,93 @@
+import os
+
+from cohdl_sim._artifact_store import ArtifactStore
+
+
+def _build(content: bytes, calls: list):
+    def build(entry):
+        calls.append(entry.name)
+        (entry / "data").write_bytes(content)
+
+    return build
+
+
+def _set_last_use(store: ArtifactStore, key: str, time: int):
+    os.utime(store.entry(key) / ".complete", (time, time))
+
+
+def test_acquire_builds_once(tmp_path):
+    store = ArtifactStore(tmp_path)
+    calls = []
+
+    with store.acquire("a", _build(b"a", calls)) as entry:
+        assert entry == store.entry("a")
+        assert (entry / "data").read_bytes() == b"a"
+
+    with store.acquire("a", _build(b"other", calls)) as entry:
+        assert (entry / "data").read_bytes() == b"a"
+
+    assert calls == ["a"]
+
+
+def test_acquire_rebuilds_incomplete_entries(tmp_path):
+    store = ArtifactStore(tmp_path)
+    calls = []
+
+    # leftover of an interrupted build
+    store.entry("a").mkdir()
+    (store.entry("a") / "partial").write_bytes(b"")
+
+    with store.acquire("a", _build(b"a", calls)) as entry:
+        assert sorted(path.name for path in entry.iterdir()) == [".complete", "data"]
+
+    assert calls == ["a"]
+
+
+def test_evict_least_recently_used(tmp_path):
+    store = ArtifactStore(tmp_path)
+
+    for key in ("a", "b", "c"):
+        with store.acquire(key, _build(bytes(100), [])):
+            pass
+
+    # "a" was built first, but used last
+    _set_last_use(store, "a", 3000)
+    _set_last_use(store, "b", 1000)
+    _set_last_use(store, "c", 2000)
+
+    store.max_size = 250
+    store.evict()
+
+    assert store.is_complete(store.entry("a"))
+    assert not store.entry("b").exists()
+    assert store.is_complete(store.entry("c"))
+
+    # lock files of removed entries are deleted
+    assert not (tmp_path / "b.lock").exists()
+    assert (tmp_path / "a.lock").exists()
+
+
+def test_evict_keeps_new_entry(tmp_path):
+    store = ArtifactStore(tmp_path, max_size=150)
+
+    with store.acquire("a", _build(bytes(100), [])):
+        pass
+
+    _set_last_use(store, "a", 1000)
+
+    # building "b" exceeds the limit and evicts "a", but never "b" itself
+    with store.acquire("b", _build(bytes(100), [])) as entry:
+        assert store.is_complete(entry)
+
+    assert not store.entry("a").exists()
+
+
+def test_evict_skips_entries_in_use(tmp_path):
+    store = ArtifactStore(tmp_path, max_size=0)
+
+    with store.acquire("a", _build(bytes(100), [])) as entry:
+        store.evict()
+        assert store.is_complete(entry)
+
+    store.evict()
+    assert not store.entry("a").exists()
@@ -0,0 +1,152 @@
+import os
+from pathlib import Path
+
+from cohdl import Entity, Port, Bit, Unsigned, std
+
+from cohdl_sim._build_cache import (
+    _library_sources,
+    design_hash,
+    generate_sources,
+    is_up_to_date,
+    write_cache_file,
+    write_sources,
+)
+
+
+class Counter(Entity):
+    clk = Port.input(Bit)
+    cnt = Port.output(Unsigned[8])
+
+    def architecture(self):
+        pass
+
+
+class WideCounter(Entity):
+    clk = Port.input(Bit)
+    cnt = Port.output(Unsigned[16])
+
+    def architecture(self):
+        pass
+
+
+def _hash(entity=Counter, sources=None, extra=(), toolchain="ghdl 4.0"):
+    if sources is None:
+        sources = {"vhdl/Counter.vhd": "entity Counter is end;"}
+
+    return design_hash(entity, sources, list(extra), [], toolchain)
+
+
+def test_design_hash_is_stable():
+    assert _hash() == _hash()
+
+
+def test_design_hash_depends_on_inputs(tmp_path):
+    extra = tmp_path / "extra.vhd"
+    extra.write_text("-- version 1")
+
+    reference = _hash(extra=[extra])
+
+    assert _hash(extra=[extra], toolchain="ghdl 5.0") != reference
+    assert _hash(WideCounter, extra=[extra]) != reference
+    assert (
+        _hash(sources={"vhdl/Counter.vhd": "entity Counter is end ;"}, extra=[extra])
+        != reference
+    )
+
+    extra.write_text("-- version 2")
+    assert _hash(extra=[extra]) != reference
+
+
+def test_design_hash_ignores_output_directory():
+    # only the file name of generated sources is hashed,
+    # so designs built in different directories share cache entries
+    assert _hash(sources={"a/Counter.vhd": "x"}) == _hash(
+        sources={"b/Counter.vhd": "x"}
+    )
+
+
+def test_generate_sources(tmp_path):
+    sources = generate_sources(Counter, tmp_path)
+
+    assert list(sources) == [str(tmp_path / "Counter.vhd")]
+    assert "entity Counter is" in sources[str(tmp_path / "Counter.vhd")]
+
+
+def test_is_up_to_date(tmp_path):
+    source = tmp_path / "Counter.vhd"
+    artifact = tmp_path / "libCounter.so"
+    cache = tmp_path / "cohdl_sim_cache.json"
+
+    source.write_text("")
+    artifact.write_text("")
+
+    assert not is_up_to_date(cache, "hash")
+
+    write_cache_file(cache, Counter, [str(source)], "hash", [artifact])
+
+    assert is_up_to_date(cache, "hash", [artifact])
+    assert not is_up_to_date(cache, "other hash", [artifact])
+
+    artifact.unlink()
+    assert not is_up_to_date(cache, "hash", [artifact])
+
+    write_cache_file(cache, Counter, [str(source)], "hash")
+    assert is_up_to_date(cache, "hash")
+
+    source.unlink()
+    assert not is_up_to_date(cache, "hash")
+
+
+def test_is_up_to_date_other_artifact(tmp_path):
+    # a cache file written by a build into the artifact store
+    # does not describe an existing local build of another design
+    local = tmp_path / "libCounter.so"
+    store = tmp_path / "libCounter-store.so"
+    cache = tmp_path / "cohdl_sim_cache.json"
+
+    local.write_text("")
+    store.write_text("")
+
+    write_cache_file(cache, Counter, [], "hash", [store])
+
+    assert is_up_to_date(cache, "hash", [store])
+    assert not is_up_to_date(cache, "hash", [local])
+
+
+def test_is_up_to_date_invalid_cache_file(tmp_path):
+    cache = tmp_path / "cohdl_sim_cache.json"
+    cache.write_text("{ not json")
+
+    assert not is_up_to_date(cache, "hash")
+
+
+def test_write_sources_keeps_unchanged_files(tmp_path):
+    first = tmp_path / "first.vhd"
+    second = tmp_path / "second.vhd"
+
+    write_sources({str(first): "first", str(second): "second"})
+
+    assert first.read_text() == "first\n"
+    assert second.read_text() == "second\n"
+
+    os.utime(first, ns=(0, 0))
+    os.utime(second, ns=(0, 0))
+
+    write_sources({str(first): "first", str(second): "changed"})
+
+    assert first.stat().st_mtime_ns == 0
+    assert second.stat().st_mtime_ns != 0
+    assert second.read_text() == "changed\n"
+
+
+def test_library_sources_use_cohdl_entity_list(tmp_path):
+    # _library_sources reads the private entity list of cohdl's VhdlLibrary,
+    # this test fails when cohdl renames it and the slower write_dir
+    # fallback would be used silently
+    lib = std.VhdlCompiler.to_vhdl_library(Counter)
+
+    assert hasattr(lib, "_entities")
+    assert _library_sources(lib) == {
+        Path(file_path).name: Path(file_path).read_text().removesuffix("\n")
+        for file_path in lib.write_dir(tmp_path)
+    }
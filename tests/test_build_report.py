@@ -0,0 +1,107 @@
+import json
+import threading
+
+from cohdl_sim._build_report import BuildReport, Phase, record_subprocess
+
+
+def _report():
+    return BuildReport(
+        [
+            Phase("analysis", wall_time=1.5, cpu_time=3.25, file_count=4),
+            Phase("link", wall_time=0.5, cpu_time=0.25, file_count=1),
+        ]
+    )
+
+
+def test_str():
+    assert str(_report()).splitlines() == [
+        "phase                  wall [s]    cpu [s]  files",
+        "analysis                  1.500      3.250      4",
+        "link                      0.500      0.250      1",
+        "total                     2.000      3.500      0",
+    ]
+
+
+def test_to_dict(tmp_path):
+    report = _report()
+    expected = {
+        "wall_time": 2.0,
+        "cpu_time": 3.5,
+        "phases": [
+            {
+                "name": "analysis",
+                "wall_time": 1.5,
+                "cpu_time": 3.25,
+                "file_count": 4,
+                "file_size": 0,
+            },
+            {
+                "name": "link",
+                "wall_time": 0.5,
+                "cpu_time": 0.25,
+                "file_count": 1,
+                "file_size": 0,
+            },
+        ],
+    }
+
+    assert report.to_dict() == expected
+
+    report.write_json(tmp_path / "report.json")
+    assert json.loads((tmp_path / "report.json").read_text()) == expected
+
+
+def test_phase_counts_files(tmp_path):
+    report = BuildReport()
+    output = tmp_path / "output.o"
+
+    with report.phase("analysis", files=[output]):
+        # files are counted after the block, so outputs can be listed
+        output.write_bytes(bytes(10))
+
+    (phase,) = report.phases
+    assert phase.name == "analysis"
+    assert phase.file_count == 1
+    assert phase.file_size == 10
+
+
+def test_record_subprocess():
+    report = BuildReport()
+
+    with report.phase("outer"):
+        with report.phase("inner"):
+            record_subprocess(10.0)
+
+        record_subprocess(5.0)
+
+    # outside of phases the CPU time is not recorded anywhere
+    record_subprocess(100.0)
+
+    inner, outer = report.phases
+    assert 10.0 <= inner.cpu_time < 11.0
+    assert 15.0 <= outer.cpu_time < 16.0
+
+
+def test_record_subprocess_per_thread():
+    # phases of concurrent builds only include their own subprocesses
+    reports = [BuildReport(), BuildReport()]
+    barrier = threading.Barrier(2)
+
+    def build(report, cpu_time):
+        with report.phase("build"):
+            barrier.wait()
+            record_subprocess(cpu_time)
+            barrier.wait()
+
+    threads = [
+        threading.Thread(target=build, args=(report, cpu_time))
+        for report, cpu_time in zip(reports, (10.0, 20.0))
+    ]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert 10.0 <= reports[0].phases[0].cpu_time < 11.0
+    assert 20.0 <= reports[1].phases[0].cpu_time < 21.0
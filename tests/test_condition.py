@@ -0,0 +1,119 @@
+import pytest
+
+from cohdl import Bit, BitVector, Signed, Unsigned
+
+from cohdl_sim._condition import AllOf, AnyOf, BitSet, Equals, Not, as_condition
+
+
+def test_equals(make_port):
+    port = make_port(Unsigned[4], "0101")
+    cond = Equals(port, 5)
+
+    assert cond.value == "0101"
+    assert cond()
+
+    port.binstr = "0110"
+    assert not cond()
+
+    assert Equals(port, "0110")()
+    assert Equals(port, Unsigned[4](6))()
+
+
+def test_equals_signed(make_port):
+    port = make_port(Signed[4], "1110")
+
+    assert Equals(port, -2)()
+    assert not Equals(port, -1)()
+
+
+def test_equals_bit(make_port):
+    port = make_port(Bit, "1")
+
+    assert Equals(port, True)()
+    assert not Equals(port, False)()
+
+
+def test_equals_width_mismatch(make_port):
+    port = make_port(BitVector[4], "0000")
+
+    with pytest.raises(AssertionError):
+        Equals(port, BitVector[3]("000"))
+
+
+def test_equals_requires_top_level_port(make_port):
+    port = make_port(Unsigned[4], "0101")
+
+    with pytest.raises(AssertionError):
+        Equals(port[1:0], 1)
+
+    with pytest.raises(AssertionError):
+        Equals(port, make_port(Unsigned[4], "0101"))
+
+
+def test_bit_set(make_port):
+    port = make_port(Unsigned[4], "0101")
+
+    assert [BitSet(port, index)() for index in range(4)] == [
+        True,
+        False,
+        True,
+        False,
+    ]
+
+    with pytest.raises(AssertionError):
+        BitSet(port, 4)
+
+    # vector ports require an index
+    with pytest.raises(AssertionError):
+        BitSet(port)
+
+    bit = make_port(Bit, "0")
+    assert not BitSet(bit)()
+
+    bit.binstr = "1"
+    assert BitSet(bit)()
+
+
+def test_combined_conditions(make_port):
+    valid = make_port(Bit, "1")
+    ready = make_port(Bit, "0")
+    data = make_port(Unsigned[8], "00000011")
+
+    # single bit ports are used as BitSet conditions
+    handshake = AllOf(valid, ready)
+    either = AnyOf(valid, ready)
+
+    assert not handshake()
+    assert either()
+    assert Not(ready)()
+
+    ready.binstr = "1"
+    assert handshake()
+    assert not Not(ready)()
+
+    cond = (Equals(data, 3) & valid) | ~BitSet(data, 0)
+    assert cond()
+
+    data.binstr = "00000001"
+    assert not cond()
+
+    data.binstr = "00000010"
+    assert cond()
+
+
+def test_as_condition(make_port):
+    bit = make_port(Bit, "1")
+    vector = make_port(Unsigned[4], "0000")
+
+    assert isinstance(as_condition(bit), BitSet)
+    assert as_condition(lambda: True) is None
+    assert as_condition(vector) is None
+
+    cond = Equals(vector, 0)
+    assert as_condition(cond) is cond
+
+    with pytest.raises(AssertionError):
+        as_condition(vector, required=True)
+
+    with pytest.raises(AssertionError):
+        AllOf(bit, lambda: True)
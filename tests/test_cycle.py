@@ -0,0 +1,99 @@
+import pytest
+
+from cohdl import Bit, BitVector, Signed, Unsigned
+
+from cohdl_sim._cycle import _CyclePorts, CycleHandle
+
+
+def test_sample(make_port):
+    flag = make_port(Bit, "1")
+    count = make_port(Unsigned[8], "00000101")
+    offset = make_port(Signed[4], "1110")
+    raw = make_port(BitVector[4], "1001")
+
+    ports = _CyclePorts([], [flag, count, offset, raw])
+
+    assert ports.sample() == [True, 5, -2, 9]
+    assert ports.values(["0", "11111111", "0111", "0000"]) == [False, 255, 7, 0]
+
+
+def test_binstrs(make_port):
+    enable = make_port(Bit, "0")
+    data = make_port(Unsigned[4], "0000")
+    delta = make_port(Signed[4], "0000")
+
+    ports = _CyclePorts([enable, data, delta], [])
+
+    assert ports.binstrs(None) is None
+    assert ports.binstrs((True, 10, -3)) == ["1", "1010", "1101"]
+    assert ports.binstrs([False, 0, 7]) == ["0", "0000", "0111"]
+
+    # None leaves an input unchanged
+    assert ports.binstrs((None, 1, None)) == ["", "0001", ""]
+
+    # values of CoHDL types are converted like in conditions
+    assert ports.binstrs((True, "0011", Signed[4](-1))) == ["1", "0011", "1111"]
+
+
+def test_binstrs_single_input(make_port):
+    ports = _CyclePorts([make_port(Unsigned[4], "0000")], [])
+
+    assert ports.binstrs(3) == ["0011"]
+    assert ports.binstrs((3,)) == ["0011"]
+
+
+def test_binstrs_invalid(make_port):
+    ports = _CyclePorts(
+        [make_port(Unsigned[4], "0000"), make_port(Signed[4], "0000")], []
+    )
+
+    with pytest.raises(AssertionError):
+        ports.binstrs((1,))
+
+    with pytest.raises(AssertionError):
+        ports.binstrs((16, 0))
+
+    with pytest.raises(AssertionError):
+        ports.binstrs((0, 8))
+
+    with pytest.raises(AssertionError):
+        ports.binstrs((0, -9))
+
+
+def test_drive(make_port):
+    enable = make_port(Bit, "0")
+    data = make_port(Unsigned[4], "0000")
+
+    ports = _CyclePorts([enable, data], [])
+
+    ports.drive((True, 12))
+    assert (enable.binstr, data.binstr) == ("1", "1100")
+
+    ports.drive((None, 1))
+    assert (enable.binstr, data.binstr) == ("1", "0001")
+
+    ports.drive(None)
+    assert (enable.binstr, data.binstr) == ("1", "0001")
+
+
+def test_requires_top_level_ports(make_port):
+    data = make_port(Unsigned[4], "0000")
+
+    with pytest.raises(AssertionError):
+        _CyclePorts([data[1:0]], [])
+
+    with pytest.raises(AssertionError):
+        _CyclePorts([], [lambda: True])
+
+
+def test_cycle_handle():
+    removed = []
+    handle = CycleHandle(lambda: removed.append(True))
+
+    assert not handle.removed
+
+    handle.remove()
+    handle.remove()
+
+    assert handle.removed
+    assert removed == [True]
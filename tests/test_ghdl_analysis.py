@@ -0,0 +1,113 @@
+import pytest
+
+try:
+    from cohdl_sim.ghdl_sim._build_simulation import (
+        _analysis_order,
+        _file_hash,
+        _load_analysis_state,
+        _outdated_files,
+        _write_analysis_state,
+    )
+except (ImportError, AssertionError):
+    # ghdl_sim requires GHDL and the compiled simulator interface
+    pytest.skip("ghdl_sim is not available", allow_module_level=True)
+
+TYPES = b"package Types is\nend Types;\n"
+CHILD = b"use work.Types.all;\nentity Child is\nend Child;\n"
+TOP = b"entity Top is\nend Top;\narchitecture a of Top is\nbegin\n  c: entity work.Child;\nend a;\n"
+OTHER = b"entity Other is\nend Other;\n"
+
+
+def _state(contents):
+    return {name: {"hash": _file_hash(content)} for name, content in contents.items()}
+
+
+def test_analysis_state_roundtrip(tmp_path):
+    path = tmp_path / ".ghdl-analysis.json"
+    files = _state({"top.vhd": TOP})
+
+    assert _load_analysis_state(path, "ghdl 4.0", ["--std=08"]) is None
+
+    _write_analysis_state(path, "ghdl 4.0", ["--std=08"], files)
+
+    assert _load_analysis_state(path, "ghdl 4.0", ["--std=08"]) == files
+    assert _load_analysis_state(path, "ghdl 5.0", ["--std=08"]) is None
+    assert _load_analysis_state(path, "ghdl 4.0", ["--std=93"]) is None
+
+
+def test_outdated_files():
+    contents = {"types.vhd": TYPES, "child.vhd": CHILD, "top.vhd": TOP}
+    previous = _state(contents)
+
+    assert _outdated_files(previous, contents) == []
+
+    changed = {**contents, "types.vhd": TYPES + b"\n"}
+    assert _outdated_files(previous, changed) == ["types.vhd", "child.vhd", "top.vhd"]
+
+    changed = {**contents, "top.vhd": TOP + b"\n"}
+    assert _outdated_files(previous, changed) == ["top.vhd"]
+
+    # new files are analyzed without rebuilding the library
+    added = {"other.vhd": OTHER, **contents}
+    assert _outdated_files(previous, added) == ["other.vhd"]
+
+
+def test_outdated_files_rebuild():
+    contents = {"types.vhd": TYPES, "child.vhd": CHILD}
+
+    assert _outdated_files(None, contents) is None
+
+    # removed files require a clean work library
+    removed = {"child.vhd": CHILD}
+    assert _outdated_files(_state(contents), removed) is None
+
+
+def test_analysis_order():
+    contents = {
+        "other.vhd": OTHER,
+        "top.vhd": TOP,
+        "child.vhd": CHILD,
+        "types.vhd": TYPES,
+    }
+
+    assert _analysis_order(list(contents), contents) == [
+        "other.vhd",
+        "types.vhd",
+        "child.vhd",
+        "top.vhd",
+    ]
+
+    # dependencies outside of the analyzed files are already available
+    assert _analysis_order(["top.vhd", "other.vhd"], contents) == [
+        "top.vhd",
+        "other.vhd",
+    ]
+
+
+def test_analysis_order_component():
+    component = (
+        b"entity Wrapper is\nend Wrapper;\n"
+        b"architecture a of Wrapper is\n"
+        b"    component Child\n    end component;\n"
+        b"begin\n    inst : Child port map ();\nend a;\n"
+    )
+    contents = {"wrapper.vhd": component, "child.vhd": CHILD, "types.vhd": TYPES}
+
+    assert _analysis_order(list(contents), contents) == [
+        "types.vhd",
+        "child.vhd",
+        "wrapper.vhd",
+    ]
+
+
+def test_analysis_order_cyclic():
+    first = b"entity First is\nend First;\nuse work.Second;\n"
+    second = b"entity Second is\nend Second;\nuse work.First;\n"
+    contents = {"first.vhd": first, "second.vhd": second, "types.vhd": TYPES}
+
+    # files in a cycle are analyzed in the given order
+    assert _analysis_order(list(contents), contents) == [
+        "types.vhd",
+        "first.vhd",
+        "second.vhd",
+    ]
@@ -0,0 +1,273 @@
+import gc
+
+from functools import partial
+
+import pytest
+
+from cohdl import Entity, Port, Bit, Unsigned
+from cohdl import std
+
+from cohdl_sim import VhdlLibrary, Equals
+from cohdl_sim._base_simulation import _BaseSimulator
+
+try:
+    from cohdl_sim.ghdl_sim import Simulator
+except (ImportError, AssertionError):
+    # ghdl_sim requires GHDL and the compiled simulator interface
+    pytest.skip("ghdl_sim is not available", allow_module_level=True)
+
+
+class Counter(Entity):
+    clk = Port.input(Bit)
+    cnt = Port.output(Unsigned[8], default=0)
+
+    def architecture(self):
+        @std.sequential(std.Clock(self.clk))
+        def proc():
+            self.cnt <<= self.cnt + 1
+
+
+class Pair(Entity):
+    clk = Port.input(Bit)
+    first = Port.output(Unsigned[8])
+    second = Port.output(Unsigned[8])
+
+    def architecture(self):
+        Counter(clk=self.clk, cnt=self.first)
+        Counter(clk=self.clk, cnt=self.second)
+
+
+@pytest.fixture(scope="module")
+def sim(tmp_path_factory):
+    return Simulator(Counter, build_dir=str(tmp_path_factory.mktemp("ghdl_sim")))
+
+
+def test_waits_release_callbacks(sim):
+    # the number of live objects does not grow with the number of waits
+    object_counts = []
+
+    @sim.test
+    async def testbench(entity):
+        sim.gen_clock(entity.clk, std.ns(2))
+
+        for _ in range(3):
+            for _ in range(20000):
+                await sim.wait(std.ns(1))
+                await sim.delta_step()
+
+            gc.collect()
+            object_counts.append(len(gc.get_objects()))
+
+    assert len(object_counts) == 3
+    assert object_counts[2] - object_counts[0] < 100
+
+
+def test_many_tasks(sim):
+    finished = 0
+
+    @sim.test
+    async def testbench(entity):
+        nonlocal finished
+
+        async def transaction():
+            nonlocal finished
+            await sim.wait(std.ns(1))
+            finished += 1
+
+        tasks = [sim.start_soon(transaction()) for _ in range(30000)]
+
+        for task in tasks:
+            await task.join()
+
+    assert finished == 30000
+
+
+def test_nested_joins(sim):
+    # joined tasks are resumed from the ready queue, so the stack depth
+    # does not grow with the length of the chain (5000 > recursion limit)
+    done = []
+
+    @sim.test
+    async def testbench(entity):
+        async def chain(n):
+            if n != 0:
+                await (await sim.start(chain(n - 1))).join()
+
+        await sim.start_soon(chain(5000)).join()
+        done.append(True)
+
+    assert done == [True]
+
+
+def test_join_order(sim):
+    order = []
+
+    @sim.test
+    async def testbench(entity):
+        sim.gen_clock(entity.clk, std.ns(2))
+
+        async def child(index):
+            order.append(("start", index))
+            await sim.rising_edge(entity.clk)
+            order.append(("end", index))
+
+        # start runs the task until its first wait,
+        # start_soon only schedules it
+        first = await sim.start(child(0))
+        order.append("started")
+        second = sim.start_soon(child(1))
+        order.append("scheduled")
+
+        async def joiner(index):
+            await second.join()
+            order.append(("joined", index))
+
+        joiners = [sim.start_soon(joiner(index)) for index in range(3)]
+
+        for task in [first, *joiners]:
+            await task.join()
+
+    assert order == [
+        ("start", 0),
+        "started",
+        "scheduled",
+        ("start", 1),
+        ("end", 0),
+        ("end", 1),
+        ("joined", 0),
+        ("joined", 1),
+        ("joined", 2),
+    ]
+
+
+def test_on_cycle(sim):
+    # the cycle function sees the counter value after each rising edge,
+    # the same values a coroutine sees after true_after_rising
+    sampled = []
+    expected = []
+
+    @sim.test
+    async def testbench(entity):
+        sim.gen_clock(entity.clk, std.ns(2))
+        sim.on_cycle(entity.clk, sampled.append, outputs=[entity.cnt])
+
+        for _ in range(10):
+            await sim.rising_edge(entity.clk)
+            await sim.delta_step()
+            expected.append(entity.cnt.copy().to_int())
+
+    assert sampled[: len(expected)] == expected
+    assert len(set(expected)) == len(expected)
+
+
+def test_watchdog_per_simulator(tmp_path_factory):
+    # the simulator interface is shared by all simulators of the process,
+    # each simulator applies its own limits when a test starts
+    limited = Simulator(
+        Counter,
+        build_dir=str(tmp_path_factory.mktemp("limited")),
+        max_idle_cycles=20,
+    )
+    unlimited = Simulator(Counter, build_dir=str(tmp_path_factory.mktemp("unlimited")))
+
+    def idle_testbench(sim):
+        async def testbench(entity):
+            sim.gen_clock(entity.clk, std.ns(2))
+            await sim.wait(std.ns(200))
+
+        return testbench
+
+    with pytest.raises(AssertionError, match="no testbench progress"):
+        limited.test(idle_testbench(limited))
+
+    unlimited.test(idle_testbench(unlimited))
+
+    with pytest.raises(AssertionError, match="no testbench progress"):
+        limited.test(idle_testbench(limited))
+
+
+def test_analysis_jobs(tmp_path):
+    # independent libraries are analyzed concurrently,
+    # the multi file design is bound, linked and simulated
+    libraries = []
+
+    for name in ("lib_a", "lib_b"):
+        file = tmp_path / f"{name}.vhd"
+        file.write_text(
+            f"package {name}_pkg is\n    constant value : integer := 1;\nend;\n"
+        )
+        libraries.append(VhdlLibrary(name, [file]))
+
+    sim = Simulator(
+        Pair,
+        build_dir=str(tmp_path / "build"),
+        vhdl_libraries=libraries,
+        analysis_jobs=2,
+    )
+
+    values = []
+
+    @sim.test
+    async def testbench(entity):
+        sim.gen_clock(entity.clk, std.ns(2))
+
+        for _ in range(5):
+            await sim.rising_edge(entity.clk)
+
+        await sim.delta_step()
+        values.append((entity.first.copy().to_int(), entity.second.copy().to_int()))
+
+    assert values == [(5, 5)]
+
+
+def test_true_after_rising(sim):
+    # native conditions are sampled one step after the edge,
+    # like a coroutine awaiting rising_edge and delta_step
+    results = []
+
+    @sim.test
+    async def testbench(entity):
+        sim.gen_clock(entity.clk, std.ns(2))
+
+        await sim.true_after_rising(entity.clk, Equals(entity.cnt, 10))
+        results.append(entity.cnt.copy().to_int())
+
+        await sim.true_after_falling(entity.clk, Equals(entity.cnt, 12))
+        results.append(entity.cnt.copy().to_int())
+
+        with pytest.raises(AssertionError, match="timeout"):
+            await sim.true_after_rising(entity.clk, Equals(entity.cnt, 20), timeout=6)
+
+        # the condition holds on the last allowed edge
+        await sim.true_after_rising(entity.clk, Equals(entity.cnt, 23), timeout=3)
+        results.append(entity.cnt.copy().to_int())
+
+    assert results == [10, 12, 23]
+
+
+@pytest.mark.parametrize("native", [True, False])
+def test_remove_on_cycle(sim, native):
+    calls = []
+    removed_after = []
+
+    @sim.test
+    async def testbench(entity):
+        sim.gen_clock(entity.clk, std.ns(2))
+
+        on_cycle = sim.on_cycle if native else partial(_BaseSimulator.on_cycle, sim)
+        handle = on_cycle(entity.clk, calls.append, outputs=[entity.cnt])
+
+        for _ in range(5):
+            await sim.rising_edge(entity.clk)
+
+        await sim.wait(std.ns(1))
+        sim.remove_on_cycle(handle)
+        removed_after.append(len(calls))
+
+        for _ in range(5):
+            await sim.rising_edge(entity.clk)
+
+        await sim.delta_step()
+
+    assert removed_after == [5]
+    assert len(calls) == 5
@@ -0,0 +1,63 @@
+import warnings
+
+import pytest
+
+from cohdl import Entity, Port, Bit
+
+from cohdl_sim.nvc_sim import Simulator
+
+
+class Counter(Entity):
+    clk = Port.input(Bit)
+
+    def architecture(self):
+        pass
+
+
+class FakeRunner:
+    def __init__(self):
+        self.builds = []
+        self.tests = []
+
+    def build(self, **kwargs):
+        self.builds.append(kwargs)
+
+    def test(self, **kwargs):
+        self.tests.append(kwargs)
+        return "results.xml"
+
+
+def test_artifact_store_not_supported(tmp_path):
+    with pytest.raises(AssertionError, match="artifact_store"):
+        Simulator(Counter, build_dir=tmp_path, artifact_store=tmp_path / "store")
+
+
+def test_cocotb_extra_args_passed_to_runner(monkeypatch, tmp_path):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        import cocotb.runner
+
+    runner = FakeRunner()
+    monkeypatch.setattr(cocotb.runner, "get_runner", lambda name: runner)
+    monkeypatch.setattr(cocotb.runner, "get_results", lambda results: (1, 0))
+
+    sim = Simulator.__new__(Simulator)
+    sim._build_args = ["--std=2008"]
+    sim._run_simulation(
+        tmp_path,
+        {"counter": ["Counter.vhd"]},
+        dict(
+            simulator="nvc",
+            sim_args=[],
+            toplevel="counter",
+            module="test_counter",
+            extra_env={},
+            waves=True,
+            seed=42,
+        ),
+    )
+
+    assert [build["build_args"] for build in runner.builds] == [["--std=2008"]]
+    assert runner.tests[0]["waves"] is True
+    assert runner.tests[0]["seed"] == 42
+    assert runner.tests[0]["hdl_toplevel"] == "counter"
@@ -0,0 +1,83 @@
+import os
+import sys
+
+import pytest
+
+from cohdl_sim import _toolchain
+from cohdl_sim._toolchain import probe_version, toolchain_version
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="uses a shell script as fake toolchain"
+)
+
+
+@pytest.fixture
+def fake_tool(tmp_path, monkeypatch):
+    # `fake-ghdl --version` prints the content of `version`
+    # and records each call in `calls`
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+
+    tool = bin_dir / "fake-ghdl"
+    tool.write_text(
+        "#!/bin/sh\n"
+        f'echo call >> "{tmp_path / "calls"}"\n'
+        f'cat "{tmp_path / "version"}"\n'
+    )
+    tool.chmod(0o755)
+
+    (tmp_path / "version").write_text("fake 1.0\n")
+
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("COHDL_SIM_CACHE", str(tmp_path / "cache"))
+    monkeypatch.setattr(_toolchain, "_probes", {})
+
+    return tool
+
+
+def _calls(tool) -> int:
+    calls = tool.parent.parent / "calls"
+    return len(calls.read_text().splitlines()) if calls.exists() else 0
+
+
+def test_missing_command(fake_tool):
+    assert probe_version("missing-ghdl") is None
+    assert toolchain_version("missing-ghdl") == ""
+
+
+def test_probe_is_cached(fake_tool):
+    assert probe_version("fake-ghdl") == "fake 1.0\n"
+    assert _calls(fake_tool) == 1
+
+    # cached in memory
+    assert probe_version("fake-ghdl") == "fake 1.0\n"
+    assert _calls(fake_tool) == 1
+
+    # cached on disk for other processes
+    _toolchain._probes.clear()
+    assert probe_version("fake-ghdl") == "fake 1.0\n"
+    assert _calls(fake_tool) == 1
+
+
+def test_probe_cache_invalidated_by_mtime(fake_tool, tmp_path):
+    assert probe_version("fake-ghdl") == "fake 1.0\n"
+
+    # an updated toolchain is probed again
+    (tmp_path / "version").write_text("fake 2.0\n")
+    stat = fake_tool.stat()
+    os.utime(fake_tool, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    _toolchain._probes.clear()
+    assert probe_version("fake-ghdl") == "fake 2.0\n"
+    assert _calls(fake_tool) == 2
+
+
+def test_unreadable_probe_cache(fake_tool, tmp_path):
+    (tmp_path / "cache").mkdir()
+    (tmp_path / "cache" / _toolchain.PROBE_CACHE_FILE).write_text("{ not json")
+
+    assert probe_version("fake-ghdl") == "fake 1.0\n"
+
+    _toolchain._probes.clear()
+    assert probe_version("fake-ghdl") == "fake 1.0\n"
+    assert _calls(fake_tool) == 1
@@ -0,0 +1,105 @@
+from cohdl_sim._vhdl_deps import scan_units, dependency_graph, dependents
+
+PACKAGE = """
+library ieee;
+use ieee.std_logic_1164.all;
+
+package Types is
+    subtype word is std_logic_vector(7 downto 0);
+end Types;
+
+package body Types is
+end package body;
+"""
+
+ENTITY = """
+use work.Types.all;
+
+-- entity Commented is
+entity Child is
+    port (x : in word);
+end Child;
+
+architecture arch of Child is
+begin
+end arch;
+"""
+
+TOP = """
+ENTITY Top IS
+END Top;
+
+ARCHITECTURE arch OF Top IS
+BEGIN
+    child_inst : entity WORK.Child port map (x => (others => '0'));
+END arch;
+"""
+
+
+def test_scan_units():
+    units = scan_units(PACKAGE)
+    assert units.declared == {"types"}
+    # the package body refers to its own package
+    assert units.referenced == set()
+
+    units = scan_units(ENTITY)
+    assert units.declared == {"child"}
+    assert units.referenced == {"types"}
+
+
+def test_scan_units_is_case_insensitive():
+    units = scan_units(TOP)
+    assert units.declared == {"top"}
+    assert units.referenced == {"child"}
+
+
+def test_scan_units_components():
+    units = scan_units("""
+        entity Wrapper is
+        end Wrapper;
+
+        architecture arch of Wrapper is
+            component Declared is
+                port (x : in bit);
+            end component;
+        begin
+            first : Declared port map (x => '0');
+            second : component Other generic map (n => 1) port map (x => '1');
+            third : entity work.Direct port map (x => '1');
+        end arch;
+        """)
+
+    assert units.declared == {"wrapper"}
+    assert units.referenced == {"declared", "other", "direct"}
+
+
+def test_dependency_graph():
+    graph = dependency_graph(
+        {"types.vhd": PACKAGE, "child.vhd": ENTITY, "top.vhd": TOP}
+    )
+
+    assert graph == {
+        "types.vhd": set(),
+        "child.vhd": {"types.vhd"},
+        "top.vhd": {"child.vhd"},
+    }
+
+
+def test_dependency_graph_ignores_unknown_units():
+    # units declared outside of the given files (for example in
+    # precompiled libraries) do not create dependencies
+    assert dependency_graph({"child.vhd": ENTITY}) == {"child.vhd": set()}
+
+
+def test_dependents():
+    graph = {
+        "types.vhd": set(),
+        "child.vhd": {"types.vhd"},
+        "other.vhd": set(),
+        "top.vhd": {"child.vhd", "other.vhd"},
+    }
+
+    assert dependents(graph, {"types.vhd"}) == {"types.vhd", "child.vhd", "top.vhd"}
+    assert dependents(graph, {"other.vhd"}) == {"other.vhd", "top.vhd"}
+    assert dependents(graph, {"top.vhd"}) == {"top.vhd"}
+    assert dependents(graph, set()) == set()